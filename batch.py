@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module renders many box plot figures to files, without pyplot and in a pool of processes
+
+Every figure is described by a `RenderJob`. The figures are built as `matplotlib.figure.Figure` objects, which are
+not registered by pyplot, so each one is freed as soon as it is saved. The jobs are run by a pool of processes, each
+worker rendering a bounded number of figures before being replaced, and only a bounded number of jobs is waiting at
+any time, so the memory does not grow with the number of figures.
+
+    jobs = [RenderJob('figures/{}'.format(name), series, plot='creative_boxplot', title=name)
+            for name, series in groups]
+    render_batch(jobs, formats=('png', 'svg'), workers=4)
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import multiprocessing
+import os
+from collections import deque
+from typing import Callable, Iterable, List
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+import boxplots
+from boxstats import BoxStats
+
+PLOTS = ('info_boxplot_v1', 'info_boxplot_v2', 'info_boxplot_v3', 'histobox_plot', 'creative_boxplot')
+
+
+class RenderJob:
+    """
+    The description of one figure to render.
+
+    Parameters
+    ----------
+    path: str
+        The path of the output files without extension, one file being written for each format.
+
+    data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats
+        The series to draw, or their precomputed statistics. The same `BoxStats` can be shared by several jobs.
+
+    plot: str or function, default: 'creative_boxplot'
+        One of the five plot functions of `boxplots`, or its name.
+
+    kwargs: dict, optional
+        The other parameters of the plot function.
+
+    title: str, optional
+        The title of the axes.
+
+    figsize: tuple, default: (10, 5)
+        The size of the figure in inches.
+
+    dpi: int, default: 100
+        The resolution of the raster formats.
+
+    """
+
+    __slots__ = ('path', 'data', 'plot', 'kwargs', 'title', 'figsize', 'dpi')
+
+    def __init__(self, path: str, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
+                 plot: str or Callable = 'creative_boxplot', kwargs: dict = None, title: str = None,
+                 figsize: tuple = (10, 5), dpi: int = 100):
+        plot = plot if isinstance(plot, str) else plot.__name__
+        assert plot in PLOTS, "The plot should be one of {}, not {}".format(PLOTS, plot)
+        self.path = path
+        self.data = data
+        self.plot = plot
+        self.kwargs = kwargs or {}
+        self.title = title
+        self.figsize = figsize
+        self.dpi = dpi
+
+    def __repr__(self) -> str:
+        return "RenderJob(path={!r}, plot={})".format(self.path, self.plot)
+
+
+def render(job: RenderJob, formats: tuple = ('png',)) -> List[str]:
+    """
+
+    This function is used to render the figure of one job to one file per format, and return the paths of the files.
+
+    The figure is a `Figure` which is not known by pyplot. The format follows the extension, such as 'png' drawn by
+    the Agg backend, 'svg' or 'pdf'.
+
+    """
+    figure = Figure(figsize=job.figsize, dpi=job.dpi)
+    ax = figure.add_subplot()
+    getattr(boxplots, job.plot)(ax, job.data, **job.kwargs)
+    if job.title is not None:
+        ax.set_title(job.title)
+    directory = os.path.dirname(job.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    paths = []
+    for extension in formats:
+        path = "{}.{}".format(job.path, extension)
+        figure.savefig(path, format=extension)
+        paths.append(path)
+    return paths
+
+
+def _init_worker():
+    # the workers never open a window
+    matplotlib.use('Agg')
+
+
+def render_batch(jobs: Iterable[RenderJob], formats: tuple = ('png',), workers: int = None,
+                 tasks_per_worker: int = 100, pending: int = None) -> List[str]:
+    """
+
+    This function is used to render many figures in a pool of processes.
+
+    Parameters
+    ----------
+    jobs: Iterable[RenderJob]
+        The figures to render, which can be a generator: the jobs are only taken when a worker can run them soon.
+
+    formats: tuple, default: ('png',)
+        The extensions of the files written for every job, such as 'png', 'svg' or 'pdf'.
+
+    workers: int, optional, default: the number of CPUs
+        The number of processes. With 1, the figures are rendered in the calling process.
+
+    tasks_per_worker: int, default: 100
+        The number of figures rendered by a process before it is replaced by a new one, which gives back all of its
+        memory.
+
+    pending: int, optional, default: 4 * workers
+        The largest number of jobs sent to the pool and not finished yet.
+
+    Returns
+    -------
+    List[str]
+        The paths of the written files, in the order of the jobs and of the formats.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [path for job in jobs for path in render(job, formats)]
+    pending = pending or 4 * workers
+    paths = []
+    # `multiprocessing.Pool` replaces its workers reliably, while a `ProcessPoolExecutor` with `max_tasks_per_child`
+    # can hang once a worker exits on Python 3.11
+    with multiprocessing.Pool(workers, initializer=_init_worker, maxtasksperchild=tasks_per_worker) as pool:
+        results = deque()
+        for job in jobs:
+            if len(results) >= pending:
+                paths += results.popleft().get()
+            results.append(pool.apply_async(render, (job, formats)))
+        while results:
+            paths += results.popleft().get()
+    return paths
+
+
+if __name__ == "__main__":
+    # one figure of the sonar issues per year for every category of apps
+    from boxstats import compute_box_stats
+    from loader import load_table
+    from tools import group_by
+
+    table = load_table("Android_open_source_dataset.csv")
+    years = table['last_updated'].astype('datetime64[Y]')
+    jobs = []
+    for category in np.unique(table['category']):
+        rows = table['category'] == category
+        names, series = group_by(table['sonar_issues'][rows], years[rows])
+        # the statistics are computed once and shared by the png and the svg files
+        stats = compute_box_stats(series, bins=10)
+        jobs.append(RenderJob(os.path.join('figures', category.replace(' ', '_').replace('&', 'and')), stats,
+                              kwargs={'labelset': [str(name) for name in names]}, title=category))
+    print(render_batch(jobs, formats=('png', 'svg')))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module measures how the plot functions of the module `boxplots` scale with the size of the data
+
+For every plot function, number of series and number of values per series, it times separately:
+1. stats: the statistics computed by `boxstats.compute_box_stats`
+2. artists: the call of the plot function on the precomputed statistics, which builds the artists
+3. render: the drawing of the figure by the Agg backend
+The `boxplot` method of matplotlib is timed the same way as a baseline, its statistics being part of the artists.
+
+The time of `import boxplots` in a new interpreter is measured too, and checked against a budget if one is given,
+the run failing when the import is slower or loads pyplot or SciPy:
+
+    python benchmark.py --import-only --import-budget 0.5
+
+The results are printed, or written to a file, as JSON, so that the runs of two versions can be compared:
+
+    python benchmark.py --sizes 1000 100000 --categories 3 30 --output bench.json
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, List
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import boxplots
+from boxstats import compute_box_stats
+from tools import gen_scaled_data
+
+# the parameters of `compute_box_stats` needed by each plot function
+PLOTS = {
+    'info_boxplot_v1': (boxplots.info_boxplot_v1, {}),
+    'info_boxplot_v2': (boxplots.info_boxplot_v2, {}),
+    'info_boxplot_v3': (boxplots.info_boxplot_v3, {'percentiles': boxplots.MULTIPLEBOX_PERCENTILES}),
+    'histobox_plot': (boxplots.histobox_plot, {'bins': 10}),
+    'creative_boxplot': (boxplots.creative_boxplot, {'bins': 10}),
+}
+
+# the modules which `import boxplots` should not load
+LAZY_MODULES = ('matplotlib.pyplot', 'scipy')
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps([time.perf_counter() - start, [name for name in {lazy!r} if name in sys.modules]]))
+"""
+
+
+def measure_import(module: str = 'boxplots', repeat: int = 5) -> dict:
+    """
+
+    This function is used to measure the time of importing `module` in new interpreters.
+
+    The smallest time of `repeat` imports is kept, and the modules of `LAZY_MODULES` which were loaded are listed.
+
+    """
+    script = _IMPORT_SCRIPT.format(module=module, lazy=LAZY_MODULES)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times, loaded = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=directory, check=True, capture_output=True,
+                                text=True).stdout
+        seconds, loaded = json.loads(output)
+        times.append(seconds)
+    return {'module': module, 'seconds': min(times), 'loaded': loaded}
+
+
+def _timed(function: Callable, *args, **kwargs) -> (float, object):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _new_axes() -> matplotlib.axes.Axes:
+    figure = Figure(figsize=(10, 5), dpi=100)
+    FigureCanvasAgg(figure)
+    return figure.add_subplot()
+
+
+def bench_plot(name: str, data: List[np.ndarray]) -> dict:
+    """
+
+    This function is used to time the three stages of one plot function on one data set.
+
+    """
+    if name == 'matplotlib_boxplot':
+        ax = _new_axes()
+        artists, _ = _timed(ax.boxplot, data)
+        stats = 0.0
+    else:
+        plot, parameters = PLOTS[name]
+        stats, result = _timed(compute_box_stats, data, **parameters)
+        ax = _new_axes()
+        artists, _ = _timed(plot, ax, result)
+    render, _ = _timed(ax.figure.canvas.draw)
+    return {'stats': stats, 'artists': artists, 'render': render,
+            'n_artists': len(ax.collections) + len(ax.patches) + len(ax.lines)}
+
+
+def run(sizes: List[int], categories: List[int], outlier_rate: float = 0.05, repeat: int = 3,
+        plots: List[str] = None, seed: int = 0) -> dict:
+    """
+
+    This function is used to run the benchmark and return its results as plain python values.
+
+    Every case is run `repeat` times and the smallest time of each stage is kept, which is the least disturbed by the
+    other processes of the machine.
+
+    Parameters
+    ----------
+    sizes: List[int]
+        The numbers of values of each series.
+
+    categories: List[int]
+        The numbers of series.
+
+    outlier_rate: float, default: 0.05
+        The share of outliers in each series.
+
+    repeat: int, default: 3
+        The number of runs of every case.
+
+    plots: List[str], optional, default: all the plot functions and 'matplotlib_boxplot'
+        The names of the plot functions to time.
+
+    seed: int, default: 0
+        The seed of the data.
+
+    Returns
+    -------
+    dict
+        The environment of the run and one record per case.
+
+    """
+    plots = plots or list(PLOTS) + ['matplotlib_boxplot']
+    records = []
+    for size in sizes:
+        for n_series in categories:
+            data = gen_scaled_data(size, outlier_rate, n_series, seed=seed)
+            for name in plots:
+                runs = [bench_plot(name, data) for _ in range(repeat)]
+                record = {'plot': name, 'size': size, 'categories': n_series, 'outlier_rate': outlier_rate}
+                for stage in ('stats', 'artists', 'render'):
+                    record[stage] = min(item[stage] for item in runs)
+                record['total'] = record['stats'] + record['artists'] + record['render']
+                record['n_artists'] = runs[0]['n_artists']
+                records.append(record)
+                print("{plot:>20} size={size:<9} categories={categories:<5} total={total:.4f}s".format(**record),
+                      file=sys.stderr)
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+            'machine': platform.machine(), 'repeat': repeat, 'seed': seed, 'results': records}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Time the plot functions of boxplots on generated data")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help="numbers of values of each series")
+    parser.add_argument('--categories', type=int, nargs='+', default=[3, 30], help="numbers of series")
+    parser.add_argument('--outlier-rate', type=float, default=0.05, help="share of outliers in each series")
+    parser.add_argument('--repeat', type=int, default=3, help="number of runs of every case")
+    parser.add_argument('--plots', nargs='+', choices=list(PLOTS) + ['matplotlib_boxplot'],
+                        help="plot functions to time, all of them by default")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the data")
+    parser.add_argument('--output', help="file to write the JSON results to, instead of the standard output")
+    parser.add_argument('--import-budget', type=float,
+                        help="fail if importing boxplots takes more seconds or loads pyplot or SciPy")
+    parser.add_argument('--import-only', action='store_true', help="only measure the import of boxplots")
+    args = parser.parse_args(argv)
+
+    if args.import_only:
+        results = {'python': platform.python_version(), 'numpy': np.__version__,
+                   'matplotlib': matplotlib.__version__, 'machine': platform.machine()}
+    else:
+        results = run(args.sizes, args.categories, outlier_rate=args.outlier_rate, repeat=args.repeat,
+                      plots=args.plots, seed=args.seed)
+    results['import'] = measure_import(repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.import_budget is not None:
+        measured = results['import']
+        assert not measured['loaded'], "Importing boxplots should not load {}".format(measured['loaded'])
+        assert measured['seconds'] <= args.import_budget, \
+            "Importing boxplots took {:.3f}s, over the budget of {}s".format(measured['seconds'], args.import_budget)
+
+
+if __name__ == "__main__":
+    main()
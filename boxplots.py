@@ -39,6 +39,9 @@ The box plot is on the left half and the frequency area is on the right side.
 
 """
 
+# the annotations are not evaluated, so `matplotlib.axes`, which is slow to import, is only loaded by the caller
+from __future__ import annotations
+
 __author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
 __copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
 __license__ = "GPL V3"
@@ -46,18 +49,492 @@ __maintainer__ = "Yuming Chen"
 __email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
 __status__ = "Experimental"
 
-import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.axes
+import matplotlib
 import matplotlib.patches
-import matplotlib.transforms as transforms
-from typing import List
-from tools import input_checking
+import matplotlib.collections
+import matplotlib.colors
+import matplotlib.ticker
+from functools import lru_cache, partial
+from inspect import signature
+from typing import Callable, List
+from boxstats import BoxStats, compute_box_stats
+from tools import group_by
+from profiling import annotate, profiled, stage
+from statscache import active_cache, fingerprint
 from matplotlib.path import Path
 import matplotlib.patches as patches
 
+# the percentiles drawn by `info_boxplot_v3` when multiplebox is True
+MULTIPLEBOX_PERCENTILES = (30, 35, 40, 45, 50, 55, 60, 65, 70)
+# the smallest height in pixels of a bar of the histograms when the level of detail follows the axes
+LOD_BAR_PIXELS = 2
+# the largest number of boxes which all get a tick on the x-axis
+MAX_TICKS = 100
+# the number of outliers, bars or curves above which `rasterize_dense=True` rasterizes them
+RASTERIZE_THRESHOLD = 1000
+
+
+def _scale_counts(total: np.ndarray) -> np.ndarray:
+    """
+    Scale the counts of the histogram to (0, 0.5), so that the bars fit into the space between two boxes.
+
+    A 2-D array holds one histogram per row, and every row is scaled on its own.
+    """
+    low = total.min(axis=-1, keepdims=True)
+    span = total.max(axis=-1, keepdims=True) - low
+    return np.divide(total - low, span, out=np.zeros(total.shape), where=span != 0) * 0.5
+
+
+@lru_cache(maxsize=8)
+def _unit_grid(points: int) -> np.ndarray:
+    """
+    Return `points` evenly spaced values over [0, 1], which are mapped onto the range of every outline.
+
+    The grid is built once for each number of points and shared between calls, so it is read-only.
+    """
+    grid = np.linspace(0, 1, points)
+    grid.flags.writeable = False
+    return grid
+
+
+def _outline_grid(stats: BoxStats, points: int) -> (np.ndarray, np.ndarray):
+    """
+    Return the middle points of the bars of every histogram and the (n, points) heights where the outlines are
+    evaluated, which go from the lowest to the highest of the clipped fences and the middle points.
+    """
+    centers = (stats.hist_edges[:, :-1] + stats.hist_edges[:, 1:]) / 2
+    low = np.minimum(np.maximum(stats.data_min, stats.low_bound), centers[:, 0])
+    high = np.maximum(np.minimum(stats.data_max, stats.up_bound), centers[:, -1])
+    return centers, low[:, None] + _unit_grid(points) * (high - low)[:, None]
+
+
+def _spline_outline(stats: BoxStats, points: int) -> (np.ndarray, np.ndarray):
+    """
+    Interpolate the scaled counts of every histogram with a cubic spline, which is flat and zero at the fences
+    clipped to the range of the data.
+
+    It returns the (n, points) heights and widths of the outlines, the widths being at least 0. A knot at the same
+    height as a previous one is left out, and a series with a single height has no outline.
+    """
+    # SciPy is only loaded by the first spline
+    from scipy.interpolate import make_interp_spline
+
+    centers, y = _outline_grid(stats, points)
+    bottom = np.maximum(stats.data_min, stats.low_bound)
+    top = np.minimum(stats.data_max, stats.up_bound)
+    widths = np.zeros_like(y)
+    for index in range(len(stats)):
+        knots_y = np.concatenate(([bottom[index]], centers[index], [top[index]]))
+        knots_x = np.concatenate(([0], _scale_counts(stats.hist_counts[index]), [0]))
+        order = np.argsort(knots_y, kind='stable')
+        knots_y, knots_x = knots_y[order], knots_x[order]
+        distinct = np.concatenate(([True], np.diff(knots_y) > 0))
+        if distinct.sum() < 2:
+            continue
+        spline = make_interp_spline(knots_y[distinct], knots_x[distinct], bc_type=([(1, 0.0)], [(1, 0.0)]))
+        widths[index] = spline(y[index])
+    return y, np.maximum(widths, 0)
+
+
+def _kde_outline(stats: BoxStats, points: int) -> (np.ndarray, np.ndarray):
+    """
+    Smooth the counts of every histogram with a gaussian kernel placed at the middle of each bar.
+
+    The bandwidth follows Scott's rule on the binned values and is at least half a bar, and the widths are scaled to
+    (0, 0.5) like the bars. All the outlines are evaluated at once, so the cost does not grow with the size of the
+    series. It returns the (n, points) heights and widths of the outlines.
+    """
+    centers, y = _outline_grid(stats, points)
+    counts = stats.hist_counts.astype(float)
+    total = counts.sum(axis=1)
+    mean = (counts * centers).sum(axis=1) / total
+    std = np.sqrt((counts * (centers - mean[:, None]) ** 2).sum(axis=1) / total)
+    barwidth = stats.hist_edges[:, 1] - stats.hist_edges[:, 0]
+    bandwidth = np.maximum(1.06 * std * total ** -0.2, barwidth / 2)
+    density = np.zeros_like(y)
+    for bar in range(counts.shape[1]):
+        distance = (y - centers[:, bar, None]) / bandwidth[:, None]
+        density += counts[:, bar, None] * np.exp(-0.5 * distance ** 2)
+    return y, density / density.max(axis=1, keepdims=True) * 0.5
+
+
+def _lod_bins(ax: matplotlib.axes, bins: int) -> int:
+    """
+    Limit the number of bins so that a bar is at least `LOD_BAR_PIXELS` high on the axes, whose size in pixels
+    follows the size and the dpi of the figure.
+    """
+    return max(1, min(bins, int(ax.bbox.height / LOD_BAR_PIXELS)))
+
+
+def _lod_stats(ax: matplotlib.axes, stats: BoxStats) -> BoxStats:
+    """
+    Merge the neighbouring bars of the histograms of precomputed statistics until they fit `_lod_bins`.
+
+    The other statistics are shared with `stats`, which is not modified.
+    """
+    bins = stats.hist_counts.shape[1]
+    step = -(-bins // _lod_bins(ax, bins))
+    if step == 1:
+        return stats
+    fields = {name: getattr(stats, name) for name in BoxStats.__slots__}
+    fields['hist_counts'] = np.add.reduceat(stats.hist_counts, np.arange(0, bins, step), axis=1)
+    fields['hist_edges'] = np.column_stack((stats.hist_edges[:, :-1:step], stats.hist_edges[:, -1]))
+    return BoxStats(**fields)
+
+
+def _thin_fliers(ax: matplotlib.axes, x: np.ndarray, y: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Keep one outlier of each box in every row of pixels of the axes.
+
+    The outliers are sorted within each box, so the outliers sharing a row of pixels follow each other. The lowest one
+    is kept, and the markers, which are several pixels wide, hide the others anyway.
+    """
+    bottom, top = ax.get_ylim()
+    row = np.floor((y - bottom) / (top - bottom) * ax.bbox.height)
+    keep = np.ones(len(y), dtype=bool)
+    keep[1:] = (row[1:] != row[:-1]) | (x[1:] != x[:-1])
+    return x[keep], y[keep]
+
+
+def _outline(stats: BoxStats, curve: str, points: int) -> (np.ndarray, np.ndarray):
+    """
+    Return the heights and widths of the curves drawn by `creative_boxplot`, looked up in the cache if there is one.
+
+    The curves are looked up by a hash of the statistics they are built from, whatever the mode of the cache, so the
+    new statistics of `_lod_stats` or of every refresh of a live plot find the curves of equal statistics, and other
+    statistics never find them. These arrays hold a few values per bar, so hashing them costs little.
+    """
+    build = _spline_outline if curve == 'spline' else _kde_outline
+    cache = active_cache()
+    if cache is None:
+        return build(stats, points)
+    sources = [stats.hist_counts, stats.hist_edges, stats.data_min, stats.data_max, stats.low_bound, stats.up_bound]
+    key = ('outline', fingerprint(sources, 'hash'), curve, points)
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache.put(key, build(stats, points))
+    return entry
+
+
+def _simplify(ax: matplotlib.axes, polygons: np.ndarray, tolerance: float) -> List[np.ndarray]:
+    """
+    Drop the vertices of the polygons which are within `tolerance` pixels of the line through their neighbours.
+
+    The polygons are simplified in the display coordinates of the axes by the path simplification of matplotlib, which
+    the vector backends do not apply to collections, and brought back to data coordinates.
+    """
+    with stage('simplify'):
+        transform = ax.transData
+        inverse = transform.inverted()
+        simplified = []
+        for vertices in polygons:
+            path = Path(vertices)
+            path.simplify_threshold = tolerance
+            cleaned = path.cleaned(transform=transform, simplify=True)
+            simplified.append(inverse.transform(cleaned.vertices[cleaned.codes != Path.STOP]))
+    return simplified
+
+
+def _dense_threshold(rasterize_dense: bool or int) -> int or None:
+    """
+    Return the number of elements above which a layer is rasterized, or None if no layer is.
+    """
+    if rasterize_dense is True:
+        return RASTERIZE_THRESHOLD
+    if rasterize_dense is False or rasterize_dense is None:
+        return None
+    return rasterize_dense
+
+
+def _rasterize(artist: matplotlib.artist.Artist, count: int, threshold: int or None):
+    """
+    Rasterize the artist in vector files when it holds more than `threshold` elements.
+    """
+    if threshold is not None and count > threshold:
+        artist.set_rasterized(True)
+
+
+def _flier_offsets(ax: matplotlib.axes, x: np.ndarray, stats: BoxStats, lod: bool = False) -> np.ndarray:
+    """
+    Return the (n, 2) centers of the outliers of every box, the i-th box being at x[i].
 
-def info_boxplot_v1(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray) -> matplotlib.axes:
+    With `lod`, the outliers are thinned by `_thin_fliers` first, so their number is bounded by the height of the axes
+    in pixels.
+    """
+    with stage('fliers'):
+        x = np.repeat(x, np.diff(stats.flier_offsets))
+        y = stats.fliers
+        if lod:
+            x, y = _thin_fliers(ax, x, y)
+    return np.column_stack((x, y))
+
+
+def _draw_fliers(ax: matplotlib.axes, offsets: np.ndarray, edgecolor: str, facecolor: str,
+                 linewidth: int or float = None, rasterize: int = None) -> matplotlib.collections.CircleCollection:
+    """
+    Draw the outliers centered at `offsets` as a single collection of circles.
+
+    The circles have a radius of 0.04 inch whatever the scale of the axes is, while their centers follow the data,
+    so they are not displayed as ellipses. The collection is rasterized when it holds more than `rasterize` circles.
+    """
+    with stage('fliers'):
+        radius = 0.04 * 72  # in points
+        collection = matplotlib.collections.CircleCollection([np.pi * radius ** 2], offsets=offsets,
+                                                             offset_transform=ax.transData,
+                                                             edgecolor=edgecolor, facecolor=facecolor,
+                                                             linewidth=linewidth)
+        _rasterize(collection, len(offsets), rasterize)
+        ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def _set_ticks(ax: matplotlib.axes, count: int, names: List[str] = None, rotation: float = 0):
+    """
+    Put a tick, labelled by `names` if given, under every box.
+
+    Beyond `MAX_TICKS` boxes the labels overlap anyway and building one tick per box takes most of the time of the
+    plot, so only some boxes, chosen by a `MaxNLocator`, get a tick.
+    """
+    if count <= MAX_TICKS:
+        ax.set_xticks(np.arange(1, count + 1))
+        if names:
+            ax.set_xticklabels(names, rotation=rotation)
+        return
+    ax.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(integer=True))
+    if names:
+        def label(value, position):
+            return names[int(value) - 1] if value == int(value) and 1 <= value <= count else ''
+        ax.xaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(label))
+        ax.tick_params(axis='x', labelrotation=rotation)
+
+
+def _hsegments(y: np.ndarray, xmin: np.ndarray, xmax: np.ndarray) -> np.ndarray:
+    """
+    Build the (n, 2, 2) segments of horizontal lines at `y` going from `xmin` to `xmax`.
+    """
+    y, xmin, xmax = np.broadcast_arrays(y, xmin, xmax)
+    return np.stack((np.stack((xmin, y), axis=-1), np.stack((xmax, y), axis=-1)), axis=-2)
+
+
+def _vsegments(x: np.ndarray, ymin: np.ndarray, ymax: np.ndarray) -> np.ndarray:
+    """
+    Build the (n, 2, 2) segments of vertical lines at `x` going from `ymin` to `ymax`.
+    """
+    x, ymin, ymax = np.broadcast_arrays(x, ymin, ymax)
+    return np.stack((np.stack((x, ymin), axis=-1), np.stack((x, ymax), axis=-1)), axis=-2)
+
+
+def _rectangles(x: np.ndarray, y: np.ndarray, width: np.ndarray, height: np.ndarray) -> np.ndarray:
+    """
+    Build the (n, 4, 2) corners of the rectangles whose lower left corners are at (x, y).
+    """
+    x, y, width, height = np.broadcast_arrays(x, y, width, height)
+    corners = np.stack((np.stack((x, y), axis=-1), np.stack((x + width, y), axis=-1),
+                        np.stack((x + width, y + height), axis=-1), np.stack((x, y + height), axis=-1)), axis=-2)
+    return corners.reshape(-1, 4, 2)
+
+
+def _draw_rectangles(ax: matplotlib.axes, corners: np.ndarray, **kwargs) -> matplotlib.collections.PolyCollection:
+    """
+    Draw the rectangles built by `_rectangles` as a single collection, with the properties `kwargs`.
+    """
+    # the corners are joined like those of `matplotlib.patches.Rectangle`
+    kwargs.setdefault('joinstyle', 'miter')
+    collection = matplotlib.collections.PolyCollection(corners, **kwargs)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def _draw_lines(ax: matplotlib.axes, segments: List[np.ndarray], styles: list) -> matplotlib.collections.LineCollection:
+    """
+    Draw the lines of every box as a single collection.
+
+    Each item of `segments` holds the segments of one kind of line, such as the medians or the caps, and the same
+    item of `styles` is its (color, linewidth, linestyle). Every kind keeps its own style through the per-segment
+    properties of the collection.
+    """
+    with stage('lines'):
+        counts = [len(item) for item in segments]
+        colors = np.repeat(matplotlib.colors.to_rgba_array([item[0] for item in styles]), counts, axis=0)
+        linewidths = np.repeat([item[1] for item in styles], counts)
+        linestyles = [item[2] for item in styles]
+        if len(set(linestyles)) == 1:
+            linestyles = linestyles[0]
+        else:
+            linestyles = [style for style, count in zip(linestyles, counts) for _ in range(count)]
+        collection = matplotlib.collections.LineCollection(np.concatenate(segments), colors=colors,
+                                                           linewidths=linewidths, linestyles=linestyles)
+        ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def _limits(stats: BoxStats) -> (tuple, tuple):
+    """
+    Return the limits of the x-axis and of the y-axis of a plot of `stats`, which leave a margin of a tenth of the
+    largest value above and below the data.
+    """
+    y_min = stats.data_min.min()
+    y_max = stats.data_max.max()
+    return (0, len(stats) + 1), (y_min - 0.1 * abs(y_max), y_max + 0.1 * abs(y_max))
+
+
+def _info_geometry(ax: matplotlib.axes, stats: BoxStats, lod: bool = False, face: bool = True,
+                   multiplebox: bool = False) -> dict:
+    """
+    Build the geometry of the artists of the info box plots: the corners of the faces of the boxes unless `face` is
+    False, the segments of every kind of line and the centers of the outliers.
+    """
+    # set the width of the box and caps
+    width = 0.2
+    x = np.arange(1, len(stats) + 1)
+    q1, median, q3 = stats.q1, stats.median, stats.q3
+    box_top, box_bottom = stats.whishi, stats.whislo
+    geometry = {}
+    if face:
+        geometry['boxes'] = _rectangles(x - width, q1, 2 * width, q3 - q1)
+    geometry['lines'] = [
+        # the bottom of box
+        _hsegments(q1, x - width, x + width),
+        # the median of box
+        _hsegments(median, x - width, x + width),
+        # the top of box
+        _hsegments(q3, x - width, x + width),
+        # the high cap
+        _hsegments(box_top, x - width / 2, x + width / 2),
+        # the low cap
+        _hsegments(box_bottom, x - width / 2, x + width / 2),
+        # the low whisker
+        _vsegments(x, box_bottom, q1),
+        # the high whisker
+        _vsegments(x, q3, box_top),
+        # the left bound of whisker
+        _vsegments(x - width, q1, q3),
+        # the right bound of whisker
+        _vsegments(x + width, q1, q3),
+    ]
+    if multiplebox:
+        # every 5%-percentile, with a thicker median on top of them
+        per5 = stats.percentiles
+        geometry['lines'].append(_hsegments(per5.ravel(), np.repeat(x - width, per5.shape[1]),
+                                            np.repeat(x + width, per5.shape[1])))
+        geometry['lines'].append(_hsegments(median, x - width, x + width))
+    geometry['fliers'] = _flier_offsets(ax, x, stats, lod)
+    return geometry
+
+
+def _histobox_geometry(ax: matplotlib.axes, stats: BoxStats, lod: bool = False) -> dict:
+    """
+    Build the geometry of the artists of `histobox_plot`: the corners of the bars, the segments of every kind of line
+    and the centers of the outliers.
+    """
+    # set the width of the box and caps
+    width = 0.2
+    x = np.arange(1, len(stats) + 1)
+    q1, median, q3 = stats.q1, stats.median, stats.q3
+    box_top, box_bottom = stats.whishi, stats.whislo
+    edges = stats.hist_edges
+    # scaler to(0,0.5)
+    total = _scale_counts(stats.hist_counts)
+    return {
+        'bars': _rectangles(x[:, None], edges[:, :-1], total, np.diff(edges, axis=1)),
+        'lines': [
+            # the axis of the bar plot
+            _vsegments(x, stats.data_min, stats.data_max),
+            # the bottom of box
+            _hsegments(q1, x - width, x),
+            # the median of box
+            _hsegments(median, x - width, x),
+            # the top of box
+            _hsegments(q3, x - width, x),
+            # the high cap
+            _hsegments(box_top, x - width / 2, x),
+            # the low cap
+            _hsegments(box_bottom, x - width / 2, x),
+            # the low whisker
+            _vsegments(x, box_bottom, q1),
+            # the high whisker
+            _vsegments(x, q3, box_top),
+            # the left bound of whisker
+            _vsegments(x - width, q1, q3),
+        ],
+        'fliers': _flier_offsets(ax, x, stats, lod),
+    }
+
+
+def _creative_geometry(ax: matplotlib.axes, stats: BoxStats, showcaps: bool = True, showfliers: bool = True,
+                       showmeans: bool = True, showtrend: bool = True, variawidth: bool = True,
+                       curve: str = 'spline', curpoints: int = 1000, lod: bool = False,
+                       simplify: bool or float = False) -> dict:
+    """
+    Build the geometry of the artists of `creative_boxplot`: the polygons under the curves, the corners of the boxes,
+    the segments of every kind of line, the vertices of the trend and the centers of the outliers, the last two
+    only when they are shown.
+    """
+    assert curve in ('spline', 'kde'), "The curve should be 'spline' or 'kde', not {}".format(curve)
+    if lod:
+        # one point of the curves for each row of pixels is enough
+        curpoints = max(2, min(curpoints, int(ax.bbox.height)))
+    # set the width of the box and caps
+    if variawidth:
+        width = 0.5 * (stats.count / stats.count.sum())
+    else:
+        width = np.full(len(stats), 0.25)
+    x = np.arange(1, len(stats) + 1)
+    q1, median, q3 = stats.q1, stats.median, stats.q3
+    box_top, box_bottom = stats.whishi, stats.whislo
+
+    # set a frequency area for each list of data
+    with stage('outline'):
+        y, widths = _outline(stats, curve, curpoints)
+    outline = np.stack((widths + x[:, None], y), axis=-1)
+    # the curve goes up, and the straight base comes back down from its top to its bottom
+    base = np.stack((np.repeat(x[:, None], 2, axis=1), y[:, [-1, 0]]), axis=-1)
+    polygons = np.concatenate((outline, base), axis=1)
+    if simplify:
+        tolerance = matplotlib.rcParams['path.simplify_threshold'] if simplify is True else simplify
+        polygons = _simplify(ax, polygons, tolerance)
+
+    lines = [
+        # the axis of the frequency area
+        _vsegments(x, stats.data_min, stats.data_max),
+        # the bottom of box
+        _hsegments(q1, x - width, x),
+        # the median of box
+        _hsegments(median, x - width, x),
+        # the top of box
+        _hsegments(q3, x - width, x),
+    ]
+    if showcaps:
+        # the high cap
+        lines.append(_hsegments(box_top, x - width / 2, x + width / 2))
+        # the low cap
+        lines.append(_hsegments(box_bottom, x - width / 2, x + width / 2))
+    lines += [
+        # the low whisker
+        _vsegments(x, box_bottom, q1),
+        # the high whisker
+        _vsegments(x, q3, box_top),
+        # the left bound of whisker
+        _vsegments(x - width, q1, q3),
+    ]
+    if showmeans:
+        # the means of the inliers
+        lines.append(_hsegments(stats.mean, x - width, x))
+    geometry = {'area': polygons, 'boxes': _rectangles(x - width, q1, width, q3 - q1), 'lines': lines}
+    if showtrend and len(stats) > 1:
+        # the broken line among the medians
+        geometry['trend'] = np.column_stack((x, median))
+    if showfliers:
+        geometry['fliers'] = _flier_offsets(ax, x, stats, lod)
+    return geometry
+
+
+@profiled
+def info_boxplot_v1(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
+                    lod: bool = False,
+                    weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                    rasterize_dense: bool or int = False) -> matplotlib.axes:
     """
     Drawing function for box plots.
 
@@ -72,6 +549,20 @@ def info_boxplot_v1(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
 
     data: list(list()), ...)
           consists in a list of list and each item of data is a list containing multiple series of numerical values
+          or the `BoxStats` returned by `compute_box_stats`, then no statistics are computed again
+
+    lod: bool, default: False
+        If True, the level of detail follows the size and the dpi of the axes: the outliers of a box which fall in
+        the same row of pixels are drawn once.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        The whole number of occurrences of every value of data, see `compute_box_stats`. It is ignored
+        when data is a `BoxStats`.
+
+    rasterize_dense: bool or int, default: False
+        If True, the outliers are drawn as an image in PDF and SVG files when there are more than
+        `RASTERIZE_THRESHOLD` (1000) of them, which keeps the files small and fast to display, while the boxes, the
+        lines and the texts stay vectors. A number is used as the threshold instead.
 
     Returns
     -------
@@ -79,73 +570,34 @@ def info_boxplot_v1(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
 
     """
 
-    # input checking
-    if isinstance(data, np.ndarray):
-        assert len(data.shape) == 2, "The input should be 2-D array"
-        assert data.dtype != '<U11', "The element in 2-D array should be numerical values"
-    else:
-        data = input_checking(data)
+    # input checking and statistics
+    with stage('stats'):
+        stats = data if isinstance(data, BoxStats) else compute_box_stats(data, weights=weights)
+    annotate(series_sizes=stats.count)
 
     # set x-axis and y-axis
-    labels = [i + 1 for i in range(len(data))]
-    y_min = min(min(data[i]) for i in range(len(data)))
-    y_max = max(max(data[i]) for i in range(len(data)))
-    ax.set_ylim(y_min - 0.1 * (abs(y_max)), y_max + 0.1 * (abs(y_max)))
-    ax.set_xlim(0, len(labels) + 1)
-    ax.set_xticks(labels)
-
-    # set a box for each list of data
-    for index in range(len(data)):
-        # set the width of the box and caps
-        width = 0.2
-        # get the quantiles
-        quantiles = np.percentile(data[index], (25, 50, 75))
-        iqr = quantiles[2] - quantiles[0]
-        # the lower bound of the box
-        low_bound = quantiles[0] - 1.5 * iqr
-        # the upper bound of the box
-        up_bound = quantiles[2] + 1.5 * iqr
-
-        # pick out and draw the outliers
-        outliers = np.concatenate((data[index][low_bound > data[index]], data[index][up_bound < data[index]]))
-        for o in outliers:
-            trans = (ax.figure.dpi_scale_trans + transforms.ScaledTranslation(labels[index], o, ax.transData))
-            circle = matplotlib.patches.Circle((0, 0), 0.04, edgecolor='black', facecolor='white',
-                                               transform=trans)
-            ax.add_patch(circle)
-            # do not consider outliers when drawing the boxplot
-            data[index] = data[index][~np.isin(data[index], o)]
-
-        # draw the whisker,caps and box
-        # define the top of box
-        box_top = min(max(data[index]), up_bound)
-        # define the bottom of box
-        box_bottom = max(min(data[index]), low_bound)
-        # draw the bottom of box
-        ax.hlines(quantiles[0], labels[index] - width, labels[index] + width, linewidth=1)
-        # draw the median of box
-        ax.hlines(quantiles[1], labels[index] - width, labels[index] + width, color='orange', linewidth=1)
-        # draw the top of box
-        ax.hlines(quantiles[2], labels[index] - width, labels[index] + width, linewidth=1)
-        # draw the high cap
-        ax.hlines(box_top, labels[index] - width / 2, labels[index] + width / 2, linewidth=1)
-        # draw the low cap
-        ax.hlines(box_bottom, labels[index] - width / 2, labels[index] + width / 2, linewidth=1)
-        # draw the low whisker
-        ax.vlines(labels[index], ymin=box_bottom, ymax=quantiles[0], linewidth=1)
-        # draw the high whisker
-        ax.vlines(labels[index], ymin=quantiles[2], ymax=box_top, linewidth=1)
-        # draw the left bound of whisker
-        ax.vlines(labels[index] - width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1)
-        # draw the right bound of whisker
-        ax.vlines(labels[index] + width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1)
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+    _set_ticks(ax, len(stats))
+
+    # draw the whisker,caps and box of every list of data at once
+    geometry = _info_geometry(ax, stats, lod=lod, face=False)
+    color = matplotlib.rcParams['lines.color']
+    _draw_lines(ax, geometry['lines'], [(color, 1, '-'), ('orange', 1, '-')] + [(color, 1, '-')] * 7)
+    # draw the outliers
+    _draw_fliers(ax, geometry['fliers'], edgecolor='black', facecolor='white',
+                 rasterize=_dense_threshold(rasterize_dense))
     return ax
 
 
-def info_boxplot_v2(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray,
+@profiled
+def info_boxplot_v2(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
                     facecolor: str = 'white', outliercolor: str = 'steelblue', boxlinecolor: str = 'black',
                     whiskercolor: str = 'black', outlierlinecolor: str = 'white', capcolor: str = 'black',
-                    medianlinecolor: str = 'orange') -> matplotlib.axes:
+                    medianlinecolor: str = 'orange', lod: bool = False,
+                    weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                    rasterize_dense: bool or int = False) -> matplotlib.axes:
     """
     Drawing function for box plots.
 
@@ -158,6 +610,7 @@ def info_boxplot_v2(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
 
     data: List[np.ndarray or List[int or float]] or np.ndarray
         consists in a list of list and each item of data is a list containing multiple series of numerical values.
+        It can also be the `BoxStats` returned by `compute_box_stats`, then no statistics are computed again.
 
     facecolor: str, default: 'white'
         The color of the faces of boxes.
@@ -180,81 +633,60 @@ def info_boxplot_v2(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
     medianlinecolor: str, default: 'orange'
         The color of the median lines in the boxes.
 
+    lod: bool, default: False
+        If True, the level of detail follows the size and the dpi of the axes: the outliers of a box which fall in
+        the same row of pixels are drawn once.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        The whole number of occurrences of every value of data, see `compute_box_stats`. It is ignored
+        when data is a `BoxStats`.
+
+    rasterize_dense: bool or int, default: False
+        If True, the outliers are drawn as an image in PDF and SVG files when there are more than
+        `RASTERIZE_THRESHOLD` (1000) of them, which keeps the files small and fast to display, while the boxes, the
+        lines and the texts stay vectors. A number is used as the threshold instead.
+
     Returns
     -------
     matplotlib.axes
 
     """
 
-    # input checking
-    if isinstance(data, np.ndarray):
-        assert len(data.shape) == 2, "The input should be 2-D array"
-        assert data.dtype != '<U11', "The element in 2-D array should be numerical values"
-    else:
-        data = input_checking(data)
+    # input checking and statistics
+    with stage('stats'):
+        stats = data if isinstance(data, BoxStats) else compute_box_stats(data, weights=weights)
+    annotate(series_sizes=stats.count)
 
     # set x-axis and y-axis
-    labels = [i + 1 for i in range(len(data))]
-    y_min = min(min(data[i]) for i in range(len(data)))
-    y_max = max(max(data[i]) for i in range(len(data)))
-    ax.set_ylim(y_min - 0.1 * abs(y_max), y_max + 0.1 * (abs(y_max)))
-    ax.set_xlim(0, len(labels) + 1)
-    ax.set_xticks(labels)
-
-    # set a box for each list of data
-    for index in range(len(data)):
-        # set the width of the box and caps
-        width = 0.2
-        quantiles = np.percentile(data[index], (25, 50, 75))  # get the quantiles
-        iqr = quantiles[2] - quantiles[0]
-        low_bound = quantiles[0] - 1.5 * iqr  # the lower bound of the box
-        up_bound = quantiles[2] + 1.5 * iqr  # the upper bound of the box
-
-        # pick out and draw the outliers
-        outliers = np.concatenate((data[index][low_bound > data[index]], data[index][up_bound < data[index]]))
-        for o in outliers:
-            trans = (ax.figure.dpi_scale_trans + transforms.ScaledTranslation(labels[index], o, ax.transData))
-            circle = matplotlib.patches.Circle((0, 0), 0.04, edgecolor=outlierlinecolor, facecolor=outliercolor,
-                                               transform=trans)
-            ax.add_patch(circle)
-            # do not consider outliers when drawing the boxplot
-            data[index] = data[index][~np.isin(data[index], o)]
-
-        # draw the whisker,caps and box
-        # define the top of box
-        box_top = min(max(data[index]), up_bound)
-        # define the bottom of box
-        box_bottom = max(min(data[index]), low_bound)
-        # draw the bottom of box
-        ax.hlines(quantiles[0], labels[index] - width, labels[index] + width, linewidth=1, color=boxlinecolor)
-        # draw the median of box
-        ax.hlines(quantiles[1], labels[index] - width, labels[index] + width, color=medianlinecolor, linewidth=1)
-        # draw the top of box
-        ax.hlines(quantiles[2], labels[index] - width, labels[index] + width, linewidth=1, color=boxlinecolor)
-        # draw the high cap
-        ax.hlines(box_top, labels[index] - width / 2, labels[index] + width / 2, linewidth=1, color=capcolor)
-        # draw the low cap
-        ax.hlines(box_bottom, labels[index] - width / 2, labels[index] + width / 2, linewidth=1, color=capcolor)
-        # draw the low whisker
-        ax.vlines(labels[index], ymin=box_bottom, ymax=quantiles[0], linewidth=1, color=whiskercolor)
-        # draw the high whisker
-        ax.vlines(labels[index], ymin=quantiles[2], ymax=box_top, linewidth=1, color=whiskercolor)
-        # draw the left bound of whisker
-        ax.vlines(labels[index] - width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1, color=boxlinecolor)
-        # draw the right bound of whisker
-        ax.vlines(labels[index] + width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1, color=boxlinecolor)
-
-        # define the color of the box's face
-        rect = plt.Rectangle((labels[index] - width, quantiles[0]), 2 * width, quantiles[2] - quantiles[0],
-                             color=facecolor)
-        ax.add_patch(rect)
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+    _set_ticks(ax, len(stats))
+
+    # draw the whisker,caps and box of every list of data at once
+    geometry = _info_geometry(ax, stats, lod=lod)
+
+    # define the color of the box's face
+    _draw_rectangles(ax, geometry['boxes'], color=facecolor)
+
+    colors = [boxlinecolor, medianlinecolor, boxlinecolor, capcolor, capcolor, whiskercolor, whiskercolor,
+              boxlinecolor, boxlinecolor]
+    styles = [(color, 1, '-') for color in colors]
+    _draw_lines(ax, geometry['lines'], styles)
+
+    # draw the outliers
+    _draw_fliers(ax, geometry['fliers'], edgecolor=outlierlinecolor, facecolor=outliercolor,
+                 rasterize=_dense_threshold(rasterize_dense))
     return ax
 
 
-def info_boxplot_v3(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray,
+@profiled
+def info_boxplot_v3(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
                     facecolor: str = 'white', outliercolor: str = 'steelblue', boxlinecolor: str = 'black',
                     whiskercolor: str = 'black', outlierlinecolor: str = 'white', capcolor: str = 'black',
-                    medianlinecolor: str = 'orange', multiplebox: bool = True) -> matplotlib.axes:
+                    medianlinecolor: str = 'orange', multiplebox: bool = True, lod: bool = False,
+                    weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                    rasterize_dense: bool or int = False) -> matplotlib.axes:
     """
     Drawing function for box plots.
 
@@ -267,6 +699,7 @@ def info_boxplot_v3(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
 
     data: List[np.ndarray or List[int or float]] or np.ndarray
         consists in a list of list and each item of data is a list containing multiple series of numerical values.
+        It can also be the `BoxStats` returned by `compute_box_stats`, then no statistics are computed again.
 
     facecolor: str, default: 'white'
         The color of the faces of boxes.
@@ -293,84 +726,67 @@ def info_boxplot_v3(ax: matplotlib.axes, data: List[np.ndarray or List[int or fl
         If true, lines which represent every 5%-percentile from the 1st quartile (Q1) until the 3rd quartile (Q3)
         will be drawn.
 
+    lod: bool, default: False
+        If True, the level of detail follows the size and the dpi of the axes: the outliers of a box which fall in
+        the same row of pixels are drawn once.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        The whole number of occurrences of every value of data, see `compute_box_stats`. It is ignored
+        when data is a `BoxStats`.
+
+    rasterize_dense: bool or int, default: False
+        If True, the outliers are drawn as an image in PDF and SVG files when there are more than
+        `RASTERIZE_THRESHOLD` (1000) of them, which keeps the files small and fast to display, while the boxes, the
+        lines and the texts stay vectors. A number is used as the threshold instead.
+
     Returns
     -------
         matplotlib.axes
 
     """
 
-    # input checking
-    if isinstance(data, np.ndarray):
-        assert len(data.shape) == 2, "The input should be 2-D array"
-        assert data.dtype != '<U11', "The element in 2-D array should be numerical values"
-    else:
-        data = input_checking(data)
+    # input checking and statistics
+    with stage('stats'):
+        if isinstance(data, BoxStats):
+            stats = data
+            assert not multiplebox or stats.percentiles is not None, \
+                "The statistics should be computed with percentiles to draw multiple boxes"
+        else:
+            stats = compute_box_stats(data, percentiles=MULTIPLEBOX_PERCENTILES if multiplebox else None,
+                                      weights=weights)
+    annotate(series_sizes=stats.count)
 
     # set x-axis and y-axis
-    labels = [i + 1 for i in range(len(data))]
-    y_min = min(min(data[i]) for i in range(len(data)))
-    y_max = max(max(data[i]) for i in range(len(data)))
-    ax.set_ylim(y_min - 0.1 * abs(y_max), y_max + 0.1 * (abs(y_max)))
-    ax.set_xlim(0, len(labels) + 1)
-    ax.set_xticks(labels)
-
-    # set a box for each list of data
-    for index in range(len(data)):
-        width = 0.2  # set the width of the box and caps
-        quantiles = np.percentile(data[index], (25, 50, 75))  # get the quantiles
-        iqr = quantiles[2] - quantiles[0]
-        low_bound = quantiles[0] - 1.5 * iqr  # the lower bound of the box
-        up_bound = quantiles[2] + 1.5 * iqr  # the upper bound of the box
-
-        # pick out and draw the outliers
-        outliers = np.concatenate((data[index][low_bound > data[index]], data[index][up_bound < data[index]]))
-        for o in outliers:
-            trans = (ax.figure.dpi_scale_trans + transforms.ScaledTranslation(labels[index], o, ax.transData))
-            circle = matplotlib.patches.Circle((0, 0), 0.04, edgecolor=outlierlinecolor, facecolor=outliercolor,
-                                               transform=trans)
-            ax.add_patch(circle)
-            # do not consider outliers when drawing the boxplot
-            data[index] = data[index][~np.isin(data[index], o)]
-
-        # draw the whisker,caps and box
-        # define the top of box
-        box_top = min(max(data[index]), up_bound)
-        # define the bottom of box
-        box_bottom = max(min(data[index]), low_bound)
-        # draw the bottom of box
-        ax.hlines(quantiles[0], labels[index] - width, labels[index] + width, linewidth=1, color=boxlinecolor)
-        # draw the median of box
-        ax.hlines(quantiles[1], labels[index] - width, labels[index] + width, color=medianlinecolor, linewidth=1)
-        # draw the top of box
-        ax.hlines(quantiles[2], labels[index] - width, labels[index] + width, linewidth=1, color=boxlinecolor)
-        # draw the high cap
-        ax.hlines(box_top, labels[index] - width / 2, labels[index] + width / 2, linewidth=1, color=capcolor)
-        # draw the low cap
-        ax.hlines(box_bottom, labels[index] - width / 2, labels[index] + width / 2, linewidth=1, color=capcolor)
-        # draw the low whisker
-        ax.vlines(labels[index], ymin=box_bottom, ymax=quantiles[0], linewidth=1, color=whiskercolor)
-        # draw the high whisker
-        ax.vlines(labels[index], ymin=quantiles[2], ymax=box_top, linewidth=1, color=whiskercolor)
-        # draw the left bound of whisker
-        ax.vlines(labels[index] - width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1, color=boxlinecolor)
-        # draw the right bound of whisker
-        ax.vlines(labels[index] + width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1, color=boxlinecolor)
-
-        if multiplebox:
-            per5 = np.percentile(data[index], (30, 35, 40, 45, 50, 55, 60, 65, 70), interpolation='midpoint')
-            for k in range(len(per5)):
-                ax.hlines(per5[k], labels[index] - width, labels[index] + width, linewidth=1, color=boxlinecolor)
-            ax.hlines(quantiles[1], labels[index] - width, labels[index] + width, color=medianlinecolor, linewidth=3)
-
-        # define the color of the box's face
-        rect = plt.Rectangle((labels[index] - width, quantiles[0]), 2 * width, quantiles[2] - quantiles[0],
-                             color=facecolor)
-        ax.add_patch(rect)
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+    _set_ticks(ax, len(stats))
+
+    # draw the whisker,caps and box of every list of data at once
+    geometry = _info_geometry(ax, stats, lod=lod, multiplebox=multiplebox)
+
+    # define the color of the box's face
+    _draw_rectangles(ax, geometry['boxes'], color=facecolor)
+
+    colors = [boxlinecolor, medianlinecolor, boxlinecolor, capcolor, capcolor, whiskercolor, whiskercolor,
+              boxlinecolor, boxlinecolor]
+    styles = [(color, 1, '-') for color in colors]
+    if multiplebox:
+        # every 5%-percentile, with a thicker median on top of them
+        styles += [(boxlinecolor, 1, '-'), (medianlinecolor, 3, '-')]
+    _draw_lines(ax, geometry['lines'], styles)
+
+    # draw the outliers
+    _draw_fliers(ax, geometry['fliers'], edgecolor=outlierlinecolor, facecolor=outliercolor,
+                 rasterize=_dense_threshold(rasterize_dense))
     return ax
 
 
-def histobox_plot(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray,
-                  bins: int = 10) -> matplotlib.axes:
+@profiled
+def histobox_plot(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
+                  bins: int = 10, lod: bool = False,
+                  weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                  rasterize_dense: bool or int = False) -> matplotlib.axes:
     """
 
     Drawing function for plot which is a mix between a box plot and a histogram
@@ -384,9 +800,23 @@ def histobox_plot(ax: matplotlib.axes, data: List[np.ndarray or List[int or floa
 
     data: List[np.ndarray or List[int or float]] or np.ndarray
         consists in a list of list and each item of data is a list containing multiple series of numerical values.
+        It can also be the `BoxStats` returned by `compute_box_stats`, then no statistics are computed again.
 
     bins: int, default: 10
 
+    lod: bool, default: False
+        If True, the level of detail follows the size and the dpi of the axes: the outliers of a box which fall in
+        the same row of pixels are drawn once, and the histograms have at most one bar for every 2 pixels of height.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        The whole number of occurrences of every value of data, see `compute_box_stats`. It is ignored
+        when data is a `BoxStats`.
+
+    rasterize_dense: bool or int, default: False
+        If True, the outliers, and the bars of the histograms, are each drawn as an image in PDF and SVG files when
+        there are more than `RASTERIZE_THRESHOLD` (1000) of them, which keeps the files small and fast to display,
+        while the boxes, the lines and the texts stay vectors. A number is used as the threshold instead.
+
     Returns
     -------
         matplotlib.axes
@@ -399,97 +829,43 @@ def histobox_plot(ax: matplotlib.axes, data: List[np.ndarray or List[int or floa
     except TypeError as err:
         print("The bins should be integer")
         raise err
-    if isinstance(data, np.ndarray):
-        assert len(data.shape) == 2, "The input should be 2-D array"
-        assert data.dtype != '<U11', "The element in 2-D array should be numerical values"
-    else:
-        data = input_checking(data)
+    with stage('stats'):
+        if isinstance(data, BoxStats):
+            stats = data
+            assert stats.hist_counts is not None, "The statistics should be computed with bins"
+            if lod:
+                stats = _lod_stats(ax, stats)
+        else:
+            stats = compute_box_stats(data, bins=_lod_bins(ax, bins) if lod else bins, weights=weights)
+    annotate(series_sizes=stats.count)
 
     # set x-axis and y-axis
-    labels = [i + 1 for i in range(len(data))]
-    ax.set_xticks(labels)
-    y_min = min(min(data[i]) for i in range(len(data)))
-    y_max = max(max(data[i]) for i in range(len(data)))
-    ax.set_ylim(y_min - 0.1 * abs(y_max), y_max + 0.1 * (abs(y_max)))
-    ax.set_xlim(0, len(labels) + 1)
-
-    # set a box for each list of data
-    for index in range(len(data)):
-        # set the width of the box and caps
-        width = 0.2
-        # get the quantiles
-        quantiles = np.percentile(data[index], (25, 50, 75))
-        iqr = quantiles[2] - quantiles[0]
-        # the lower bound of the box
-        low_bound = quantiles[0] - 1.5 * iqr
-        # the upper bound of the box
-        up_bound = quantiles[2] + 1.5 * iqr
-
-        # deal with the bar plot
-        height = max(data[index]) - min(data[index])
-        ax.vlines(labels[index], ymin=min(data[index]), ymax=max(data[index]), linewidth=1)
-        inter = height / bins
-        barwidth = height / bins
-        total = []
-        low = min(data[index])
-        for m in range(bins):
-            count = 0
-            for n in data[index]:
-                if n >= low and n < low + inter:
-                    count += 1
-            low += inter
-            # take the maximum value into consideration
-            if m == bins:
-                low += 1
-            total.append(count)
-        # scaler to(0,0.5)
-        total = [(x - min(total)) / (max(total) - min(total)) * 0.5 for x in total]
-        for p in range(len(total)):
-            rect = plt.Rectangle((labels[index], min(data[index]) + p * barwidth), total[p], barwidth,
-                                 edgecolor='black',
-                                 facecolor='silver')
-            ax.add_patch(rect)
-
-        # pick out and draw the outliers
-        outliers = np.concatenate((data[index][low_bound > data[index]], data[index][up_bound < data[index]]))
-        for o in outliers:
-            trans = (ax.figure.dpi_scale_trans + transforms.ScaledTranslation(labels[index], o, ax.transData))
-            circle = matplotlib.patches.Circle((0, 0), 0.04, edgecolor='black', facecolor='white',
-                                               transform=trans)
-            ax.add_patch(circle)
-            # do not consider outliers when drawing the boxplot
-            data[index] = data[index][~np.isin(data[index], o)]
-
-        # draw the whisker,caps and box
-        # define the top of box
-        box_top = min(max(data[index]), up_bound)
-        # define the bottom of box
-        box_bottom = max(min(data[index]), low_bound)
-        # draw the bottom of box
-        ax.hlines(quantiles[0], labels[index] - width, labels[index], linewidth=1)
-        # draw the median of box
-        ax.hlines(quantiles[1], labels[index] - width, labels[index], linewidth=1)
-        # draw the top of box
-        ax.hlines(quantiles[2], labels[index] - width, labels[index], linewidth=1)
-        # draw the high cap
-        ax.hlines(box_top, labels[index] - width / 2, labels[index], linewidth=1)
-        # draw the low cap
-        ax.hlines(box_bottom, labels[index] - width / 2, labels[index], linewidth=1)
-        # draw the low whisker
-        ax.vlines(labels[index], ymin=box_bottom, ymax=quantiles[0], linewidth=1)
-        # draw the high whisker
-        ax.vlines(labels[index], ymin=quantiles[2], ymax=box_top, linewidth=1)
-        # draw the left bound of whisker
-        ax.vlines(labels[index] - width, ymin=quantiles[0], ymax=quantiles[2], linewidth=1)
-
-    ax.set_xlim(0, len(labels) + 1)
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+    _set_ticks(ax, len(stats))
+
+    geometry = _histobox_geometry(ax, stats, lod=lod)
+    # deal with the bar plot
+    with stage('bars'):
+        bars = _draw_rectangles(ax, geometry['bars'], edgecolor='black', facecolor='silver')
+        _rasterize(bars, len(geometry['bars']), _dense_threshold(rasterize_dense))
+
+    # draw the whisker,caps and box of every list of data at once
+    _draw_lines(ax, geometry['lines'], [(matplotlib.rcParams['lines.color'], 1, '-')] * 9)
+
+    # draw the outliers
+    _draw_fliers(ax, geometry['fliers'], edgecolor='black', facecolor='white',
+                 rasterize=_dense_threshold(rasterize_dense))
     return ax
 
 
-def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray, bins: int = 10,
-                     whis: float = 1.5, labelset: list or bool = False, showcaps: bool = True, showfliers: bool = True,
-                     showmeans: bool = True, showtrend: bool = True, variawidth: bool = True,
+@profiled
+def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or float]] or np.ndarray or BoxStats,
+                     bins: int = 10, whis: float = 1.5, labelset: list or bool = False, showcaps: bool = True,
+                     showfliers: bool = True, showmeans: bool = True, showtrend: bool = True, variawidth: bool = True,
                      curfacecolor: str = 'white', curlinecolor: str = 'black', curalpha: int = 1,
+                     curve: str = 'spline', curpoints: int = 1000,
                      outlierlinecolor: str = 'white', outliercolor: str = 'steelblue', outlierlinewidth: int = 1,
                      capcolor: str = 'black', capwidth: int or float = 1,
                      whiskercolor: str = 'black', whiskerwidth: int or float = 1,
@@ -497,7 +873,10 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
                      mediancolor: str = 'orange', medianwidth: int or float = 1, medianlinestyle: str = '-',
                      meancolor: str = 'green', meanwidth: int or float = 1, meanlinestyle: str = '--',
                      trendcolor: str = 'blue', trendwidth: int or float = 1.5, trendlinestyle: str = ':',
-                     rotation: int or float = 0) -> matplotlib.axes:
+                     rotation: int or float = 0, lod: bool = False,
+                     weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                     simplify: bool or float = False,
+                     rasterize_dense: bool or int = False) -> matplotlib.axes:
     """
     Make a creative mixed plot with various properties assignable, such as color, width and line style.
     The box plot is on the left half and the frequency area is on the right side.
@@ -518,6 +897,7 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
 
     data: List[np.ndarray or List[int or float]] or np.ndarray
         consists in a list of list and each item of data is a list containing multiple series of numerical values.
+        It can also be the `BoxStats` returned by `compute_box_stats`, then no statistics are computed again.
 
     bins: int, default: 10
 
@@ -526,6 +906,7 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
         If a float, the lower whisker is at the lowest datum above Q1 - whis*(Q3-Q1),
         and the upper whisker at the highest datum below Q3 + whis*(Q3-Q1), where Q1 and Q3 are the first and third quartiles.
         The default value of whis = 1.5 corresponds to Tukey's original definition of boxplots.
+        It is ignored when data is a `BoxStats`, which was computed with its own whis.
 
     labelset: list, optional, default: [1,2,3,4,...]
         Labels for each dataset (one per dataset).
@@ -613,6 +994,15 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
     curalpha: int, default: 1
         The transparency of faces of the curves
 
+    curve: str, default: 'spline'
+        The way the curves are drawn from the histograms
+            'spline': a cubic spline through the middle points of the bars
+            'kde': a gaussian kernel density estimate of the binned values, which is cheaper for many boxes and
+                   never overshoots the bars
+
+    curpoints: int, default: 1000
+        The number of points where every curve is evaluated
+
     outliercolor: color, default: 'white'
         The color of the faces of points represent the outliers
 
@@ -622,6 +1012,26 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
     outlierlinewidth: float or int, default: 1
         The width of the edges of points represent the outliers
 
+    lod: bool, default: False
+        If True, the level of detail follows the size and the dpi of the axes: the outliers of a box which fall in
+        the same row of pixels are drawn once, the histograms have at most one bar for every 2 pixels of height and
+        the curves have at most one point for every pixel of height.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        The whole number of occurrences of every value of data, see `compute_box_stats`. It is ignored
+        when data is a `BoxStats`.
+
+    simplify: bool or float, default: False
+        If True, the points of the curves which are within rcParams['path.simplify_threshold'] (1/9) pixel of the line
+        through their neighbours are dropped, which makes SVG and PDF files much smaller without any visible change.
+        A number is used as the tolerance in pixels instead. The limits and the size of the axes should not change
+        afterwards, since the tolerance is measured on the axes as they are.
+
+    rasterize_dense: bool or int, default: False
+        If True, the outliers, and the areas under the curves, are each drawn as an image in PDF and SVG files when
+        there are more than `RASTERIZE_THRESHOLD` (1000) outliers, or curves, which keeps the files small and fast
+        to display, while the boxes, the lines and the texts stay vectors. A number is used as the threshold instead.
+
 
     Returns
     -------
@@ -634,138 +1044,149 @@ def creative_boxplot(ax: matplotlib.axes, data: List[np.ndarray or List[int or f
     except TypeError as err:
         print("The bins should be integer")
         raise err
-    if isinstance(data, np.ndarray):
-        assert len(data.shape) == 2, "The input should be 2-D array"
-        assert data.dtype != '<U11', "The element in 2-D array should be numerical values"
-    else:
-        data = input_checking(data)
-
-    # set x-axis and y-axis
-    labels = [i + 1 for i in range(len(data))]
-    y_min = min(min(data[i]) for i in range(len(data)))
-    y_max = max(max(data[i]) for i in range(len(data)))
-    ax.set_ylim(y_min - 0.1 * (abs(y_max)), y_max + 0.1 * (abs(y_max)))
-    ax.set_xlim(0, len(labels) + 1)
-
-    ax.set_xticks(labels)
-    if labelset:
-        ax.set_xticklabels(labelset, rotation=rotation)
-
-    proportion = []
-    for index in data:
-        proportion.append(len(index))
-
-    # set a box for each list of data
-    for index in range(len(data)):
-        # set the width of the box and caps
-        if variawidth:
-            width = 0.5 * (proportion[index] / sum(proportion))
+    with stage('stats'):
+        if isinstance(data, BoxStats):
+            stats = data
+            assert stats.hist_counts is not None, "The statistics should be computed with bins"
+            if lod:
+                stats = _lod_stats(ax, stats)
         else:
-            width = 0.25
-        # get the quantiles
-        quantiles = np.percentile(data[index], (25, 50, 75))
-        iqr = quantiles[2] - quantiles[0]
-        # the lower bound of the box
-        low_bound = quantiles[0] - whis * iqr
-        # the upper bound of the box
-        up_bound = quantiles[2] + whis * iqr
-        # define the top of box
-        box_top = min(max(data[index]), up_bound)
-        # define the bottom of box
-        box_bottom = max(min(data[index]), low_bound)
-
-        height = max(data[index]) - min(data[index])
-        ax.vlines(labels[index], ymin=min(data[index]), ymax=max(data[index]), linewidth=1)
-        inter = height / bins
-        barwidth = height / bins
-        total = []
-        low = min(data[index])
-        yli = []
-        xli = []
-        for m in range(bins):
-            count = 0
-            for n in data[index]:
-                if n >= low and n < low + inter:
-                    count += 1
-            low += inter
-            if m == bins - 2:
-                low += 1  # take the maximum value into consideration
-            total.append(count)
-        total = [(x - min(total)) / (max(total) - min(total)) * 0.5 for x in total]  # scaler to(0,0.5)
-        for p in range(len(total)):
-            yli.append(min(data[index]) + p * barwidth + barwidth / 2)
-            xli.append(total[p] + labels[index])
-        xli.insert(0, labels[index])
-        xli.append(labels[index])
-        yli.insert(0, box_bottom)
-        yli.append(box_top)
-
-        from operator import itemgetter
-        yli, xli = [list(x) for x in zip(*sorted(zip(yli, xli), key=itemgetter(0)))]
-        y = np.array(yli)
-        ynew = np.linspace(min(y), max(y), 1000)
-
-        from scipy.interpolate import make_interp_spline
-        power_smooth = make_interp_spline(yli, xli, bc_type=([(1, 0.0)], [(1, 0.0)]))(ynew)
-        for t in range(len(power_smooth)):
-            if power_smooth[t] < labels[index]:
-                power_smooth[t] = labels[index]
-        ax.fill_betweenx(ynew, labels[index], power_smooth, facecolor=curfacecolor, edgecolor=curlinecolor,
-                         alpha=curalpha)
-
-        rect = plt.Rectangle((labels[index] - width, quantiles[0]), width, quantiles[2] - quantiles[0],
-                             color=boxfacecolor)
-        ax.add_patch(rect)
-
-        # pick out and draw the outliers
-        outliers = np.concatenate((data[index][low_bound > data[index]], data[index][up_bound < data[index]]))
-        for o in outliers:
-            if showfliers:
-                trans = (ax.figure.dpi_scale_trans + transforms.ScaledTranslation(labels[index], o, ax.transData))
-                circle = matplotlib.patches.Circle((0, 0), 0.04, edgecolor=outlierlinecolor, facecolor=outliercolor,
-                                                   transform=trans, linewidth=outlierlinewidth)
-                ax.add_patch(circle)
-            # do not consider outliers when drawing the boxplot
-            data[index] = data[index][~np.isin(data[index], o)]
-        # draw the bottom of box
-        ax.hlines(quantiles[0], labels[index] - width, labels[index], linewidth=boxedgewidth, color=boxedgecolor)
-        # draw the median of box
-        ax.hlines(quantiles[1], labels[index] - width, labels[index], color=mediancolor, linewidth=medianwidth,
-                  ls=medianlinestyle, )
-        # draw the top of box
-        ax.hlines(quantiles[2], labels[index] - width, labels[index], linewidth=boxedgewidth, color=boxedgecolor)
-        if showcaps:
-            # draw the high cap
-            ax.hlines(box_top, labels[index] - width / 2, labels[index] + width / 2, linewidth=capwidth, color=capcolor)
-            # draw the low cap
-            ax.hlines(box_bottom, labels[index] - width / 2, labels[index] + width / 2, linewidth=capwidth,
-                      color=capcolor)
-        # draw the low whisker
-        ax.vlines(labels[index], ymin=box_bottom, ymax=quantiles[0], linewidth=whiskerwidth, color=whiskercolor)
-        # draw the high whisker
-        ax.vlines(labels[index], ymin=quantiles[2], ymax=box_top, linewidth=whiskerwidth, color=whiskercolor)
-        # draw the left bound of whisker
-        ax.vlines(labels[index] - width, ymin=quantiles[0], ymax=quantiles[2], linewidth=boxedgewidth,
-                  color=boxedgecolor)
-        if showtrend:
-            if index > 0:
-                verts = [
-                    (labels[index - 1], lastme),
-                    (labels[index], quantiles[1]), ]
-                codes = [Path.MOVETO,
-                         Path.LINETO,
-                         ]
-                path = Path(verts, codes)
-                patch = patches.PathPatch(path, color=trendcolor, ls=trendlinestyle, lw=trendwidth)
-                ax.add_patch(patch)
-            lastme = quantiles[1]
-        if showmeans:
-            ax.hlines(np.mean(data[index]), labels[index] - width, labels[index], color=meancolor, ls=meanlinestyle,
-                      linewidth=meanwidth)
+            stats = compute_box_stats(data, whis=whis, bins=_lod_bins(ax, bins) if lod else bins,
+                                      weights=weights)
+    annotate(series_sizes=stats.count)
+    # set x-axis and y-axis
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+
+    _set_ticks(ax, len(stats), labelset or None, rotation)
+
+    geometry = _creative_geometry(ax, stats, showcaps=showcaps, showfliers=showfliers, showmeans=showmeans,
+                                  showtrend=showtrend, variawidth=variawidth, curve=curve, curpoints=curpoints,
+                                  lod=lod, simplify=simplify)
+
+    # set a frequency area for each list of data
+    polygons = geometry['area']
+    area = matplotlib.collections.PolyCollection(polygons, facecolors=curfacecolor, edgecolors=curlinecolor,
+                                                 alpha=curalpha)
+    _rasterize(area, len(polygons), _dense_threshold(rasterize_dense))
+    ax.add_collection(area, autolim=False)
+
+    # set a box face for each list of data
+    _draw_rectangles(ax, geometry['boxes'], color=boxfacecolor)
+
+    # draw the whisker,caps and box of every list of data at once
+    styles = [(matplotlib.rcParams['lines.color'], 1, '-'), (boxedgecolor, boxedgewidth, '-'),
+              (mediancolor, medianwidth, medianlinestyle), (boxedgecolor, boxedgewidth, '-')]
+    if showcaps:
+        styles += [(capcolor, capwidth, '-')] * 2
+    styles += [(whiskercolor, whiskerwidth, '-')] * 2 + [(boxedgecolor, boxedgewidth, '-')]
+    if showmeans:
+        styles.append((meancolor, meanwidth, meanlinestyle))
+    _draw_lines(ax, geometry['lines'], styles)
+
+    if 'trend' in geometry:
+        # the broken line among the medians
+        patch = patches.PathPatch(Path(geometry['trend']), color=trendcolor, ls=trendlinestyle, lw=trendwidth,
+                                  fill=False)
+        ax.add_patch(patch)
+    # draw the outliers
+    if showfliers:
+        _draw_fliers(ax, geometry['fliers'], edgecolor=outlierlinecolor, facecolor=outliercolor,
+                     linewidth=outlierlinewidth, rasterize=_dense_threshold(rasterize_dense))
+    return ax
+
+
+def plot_geometry(plot: Callable, ax: matplotlib.axes, stats: BoxStats, **kwargs) -> list:
+    """
+    Build the geometry of the artists `plot` would draw on `ax` for the statistics `stats`, without drawing anything.
+
+    The limits of the axes are set like `plot` sets them, since the outliers and the curves are thinned in pixels of
+    the axes. It returns the data of the artists in the order `plot` adds them to the axes: the (n, k, 2) vertices of
+    a polygon collection, the list of the segments of every kind of line of the line collection, the vertices of the
+    path of the trend and the (n, 2) centers of the outliers. A plot already drawn then follows new statistics with
+    `set_verts`, `set_segments`, `set_path` and `set_offsets`. The other parameters of the plot function, such as
+    `lod` or `showcaps`, are given by `kwargs`, whose colors and widths are ignored.
+
+    Parameters
+    ----------
+    plot: function
+        One of the five plot functions of this module.
+
+    ax: matplotlib.axes
+
+    stats: BoxStats
+        The statistics returned by `compute_box_stats`, with the histograms and the percentiles the plot needs.
+
+    Returns
+    -------
+    list
+
+    """
+    build = {info_boxplot_v1: partial(_info_geometry, face=False), info_boxplot_v2: _info_geometry,
+             info_boxplot_v3: partial(_info_geometry, multiplebox=True), histobox_plot: _histobox_geometry,
+             creative_boxplot: _creative_geometry}[plot]
+    if plot in (histobox_plot, creative_boxplot) and kwargs.get('lod'):
+        stats = _lod_stats(ax, stats)
+    xlim, ylim = _limits(stats)
+    ax.set_ylim(ylim)
+    ax.set_xlim(xlim)
+    options = signature(build).parameters
+    geometry = build(ax, stats, **{name: value for name, value in kwargs.items() if name in options})
+    return list(geometry.values())
+
+
+@profiled
+def grouped_boxplot(ax: matplotlib.axes, table, value: str, by: str or np.ndarray, plot: Callable = info_boxplot_v1,
+                    rotation: int or float = 0, **kwargs) -> matplotlib.axes:
+    """
+    Draw one box for each group of the rows of a table, such as the `stars` of the apps of every `category`.
+
+    The rows are grouped once by `tools.group_by`, and the values of every group are handed to the plot function as
+    views of a single array, without any list or copy per group. Rows whose value or key is missing are left out.
+
+    Parameters
+    ----------
+    ax: matplotlib.axes
+
+    table: mapping of str to np.ndarray
+        The columns of the table by name, such as the dict returned by `loader.load_table` or a pandas.DataFrame.
+
+    value: str
+        The name of the column whose values are drawn.
+
+    by: str or np.ndarray
+        The name of the column holding the group of every row, or the groups themselves, such as the years of a
+        column of dates.
+
+    plot: function, default: info_boxplot_v1
+        One of the five plot functions of this module.
+
+    rotation: int or float, default: 0
+        The rotation of the names of the groups on the x-axis.
+
+    **kwargs:
+        The other parameters of the plot function.
+
+    Returns
+    -------
+    matplotlib.axes
+
+    """
+    keys = table[by] if isinstance(by, str) else by
+    names, series = group_by(table[value], keys)
+    names = [str(name) for name in names]
+    if plot is creative_boxplot:
+        kwargs.setdefault('labelset', names)
+        kwargs.setdefault('rotation', rotation)
+        return plot(ax, series, **kwargs)
+    plot(ax, series, **kwargs)
+    _set_ticks(ax, len(names), names, rotation)
     return ax
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
     # Generate test data randomly
     from tools import gen_test_data
 
@@ -0,0 +1,920 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides the statistics layer of the module `boxplots`
+
+The quartiles, whiskers, outliers and histograms of every series are computed once by `compute_box_stats` and kept in
+a `BoxStats` object. Every plot function of `boxplots` accepts such an object instead of raw data, so that drawing the
+same series with another style costs nothing in statistics.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+from typing import List, Iterable
+import numpy as np
+from tools import NUMERIC_KINDS, InvalidInput, input_checking
+from sketches import QuantileSketch, Extremes
+from profiling import annotate, profiled, stage
+from statscache import active_cache, fingerprint
+
+# the mean length of the series above which they are partitioned instead of sorted, when no percentile is requested
+PARTITION_SIZE = 2 ** 14
+
+
+class BoxStats:
+    """
+    The statistics needed to draw the boxes of multiple series.
+
+    Every attribute holds one value (or one row) per series in a numpy array.
+
+    Attributes
+    ----------
+    whis: float
+        The position of the whiskers the statistics were computed with.
+
+    count: np.ndarray
+        The number of values of each series.
+
+    mean: np.ndarray
+        The arithmetic mean of the inliers of each series.
+
+    q1, median, q3: np.ndarray
+        The quartiles of each series.
+
+    low_bound, up_bound: np.ndarray
+        The bounds outside of which values are outliers, i.e. Q1 - whis*IQR and Q3 + whis*IQR.
+
+    whislo, whishi: np.ndarray
+        The ends of the whiskers, i.e. the lowest and the highest inliers.
+
+    data_min, data_max: np.ndarray
+        The minimum and maximum of each series, outliers included.
+
+    fliers: np.ndarray
+        The outliers of all series, one series after another and sorted within each series.
+
+    flier_offsets: np.ndarray
+        The outliers of the i-th series are fliers[flier_offsets[i]:flier_offsets[i + 1]].
+
+    percentiles: np.ndarray or None
+        The extra percentiles of the inliers of each series, with shape (n, k), if they were requested.
+
+    hist_counts, hist_edges: np.ndarray or None
+        The histogram of each series, with shapes (n, bins) and (n, bins + 1), if it was requested.
+
+    """
+
+    __slots__ = ('whis', 'count', 'mean', 'q1', 'median', 'q3', 'low_bound', 'up_bound', 'whislo', 'whishi',
+                 'data_min', 'data_max', 'fliers', 'flier_offsets', 'percentiles', 'hist_counts', 'hist_edges')
+
+    def __init__(self, whis: float, count: np.ndarray, mean: np.ndarray, q1: np.ndarray, median: np.ndarray,
+                 q3: np.ndarray, low_bound: np.ndarray, up_bound: np.ndarray, whislo: np.ndarray, whishi: np.ndarray,
+                 data_min: np.ndarray, data_max: np.ndarray, fliers: np.ndarray, flier_offsets: np.ndarray,
+                 percentiles: np.ndarray = None, hist_counts: np.ndarray = None, hist_edges: np.ndarray = None):
+        self.whis = whis
+        self.count = count
+        self.mean = mean
+        self.q1 = q1
+        self.median = median
+        self.q3 = q3
+        self.low_bound = low_bound
+        self.up_bound = up_bound
+        self.whislo = whislo
+        self.whishi = whishi
+        self.data_min = data_min
+        self.data_max = data_max
+        self.fliers = fliers
+        self.flier_offsets = flier_offsets
+        self.percentiles = percentiles
+        self.hist_counts = hist_counts
+        self.hist_edges = hist_edges
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+    def __repr__(self) -> str:
+        return "BoxStats(series={}, whis={}, fliers={})".format(len(self), self.whis, len(self.fliers))
+
+    def fliers_of(self, index: int) -> np.ndarray:
+        """
+        Return the outliers of the `index`-th series.
+        """
+        return self.fliers[self.flier_offsets[index]:self.flier_offsets[index + 1]]
+
+
+def check_data(data: List[np.ndarray or List[int or float]] or np.ndarray) -> List[np.ndarray] or np.ndarray:
+    """
+
+    This function is used to check the data given to the plot functions.
+
+    A 2-D array is kept as it is, while a list is standardized by `tools.input_checking`.
+
+    """
+    if isinstance(data, np.ndarray):
+        assert len(data.shape) == 2, "The input should be 2-D array"
+        assert data.dtype.kind in NUMERIC_KINDS, "The element in 2-D array should be numerical values"
+        return data
+    return input_checking(data)
+
+
+def sort_series(data: List[np.ndarray] or np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+
+    This function is used to sort every series of data inside one concatenated float buffer.
+
+    It returns the buffer and the offsets of the series, the i-th series being buffer[offsets[i]:offsets[i + 1]].
+    A 2-D array is sorted along its rows. Many short series are sorted together with a single `np.lexsort`, while
+    long series are sorted one by one in place, which is much faster than `np.lexsort` on long series.
+
+    """
+    counts = np.array([len(item) for item in data], dtype=int)
+    assert counts.all(), "Every series should contain at least one value"
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    if isinstance(data, np.ndarray):
+        return np.sort(data, axis=1).ravel().astype(float, copy=False), offsets
+    if offsets[-1] < 256 * len(data):
+        buffer = np.concatenate(data).astype(float, copy=False)
+        segment = np.repeat(np.arange(len(data)), counts)
+        return buffer[np.lexsort((buffer, segment))], offsets
+    buffer = np.empty(offsets[-1])
+    for item, a, b in zip(data, offsets[:-1], offsets[1:]):
+        buffer[a:b] = item
+        buffer[a:b].sort()
+    return buffer, offsets
+
+
+def percentile_ranks(count: np.ndarray, percentiles: tuple) -> np.ndarray:
+    """
+
+    This function is used to get the ranks of the values which `segment_percentiles` reads for series of `count`
+    values, i.e. the floor and the ceiling of the position of every percentile, with shape (n, 2 * k).
+
+    """
+    position = (count - 1)[:, None] * (np.asarray(percentiles, dtype=float) / 100)[None, :]
+    return np.concatenate((np.floor(position), np.ceil(position)), axis=1).astype(int)
+
+
+def _select(segment: np.ndarray, kth: np.ndarray):
+    """
+    Partition the segment in place around the sorted ranks `kth`, by bisection: one partition around the middle rank,
+    then the ranks on each side within each side. The ends are found by a single argmin or argmax.
+    """
+    if not len(kth):
+        return
+    if kth[0] == 0:
+        index = segment.argmin()
+        segment[0], segment[index] = segment[index], segment[0]
+        _select(segment[1:], kth[1:] - 1)
+    elif kth[-1] == len(segment) - 1:
+        index = segment.argmax()
+        segment[-1], segment[index] = segment[index], segment[-1]
+        _select(segment[:-1], kth[:-1])
+    else:
+        middle = len(kth) // 2
+        k = kth[middle]
+        segment.partition(k)
+        _select(segment[:k], kth[:middle])
+        _select(segment[k + 1:], kth[middle + 1:] - k - 1)
+
+
+def select_ranks(buffer: np.ndarray, start: np.ndarray, stop: np.ndarray, ranks: np.ndarray):
+    """
+
+    This function is used to partition every series of the buffer in place, so that the values of the i-th series at
+    the ranks ranks[i] are those of the sorted series, and any value before (after) them is lower (higher).
+
+    The minimum and the maximum of every series are kept at its ends. Every rank is found by a partition around a
+    single rank, which numpy runs much faster than a partition around several ranks, so a few ranks of a long series
+    cost less than sorting it.
+
+    """
+    ends = np.column_stack((np.zeros(len(start), dtype=int), stop - start - 1))
+    for a, b, kth in zip(start, stop, np.concatenate((ends, ranks), axis=1)):
+        _select(buffer[a:b], np.unique(kth))
+
+
+def partition_series(data: List[np.ndarray], percentiles: tuple = (25, 50, 75)) -> (np.ndarray, np.ndarray):
+    """
+
+    This function is used to gather every series of data inside one concatenated float buffer, like `sort_series`,
+    but only partitioned by `select_ranks`: the minimum, the maximum and the values read by `segment_percentiles`
+    for `percentiles` are in place, so these percentiles are exact.
+
+    """
+    counts = np.array([len(item) for item in data], dtype=int)
+    assert counts.all(), "Every series should contain at least one value"
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    buffer = np.empty(offsets[-1])
+    for item, a, b in zip(data, offsets[:-1], offsets[1:]):
+        buffer[a:b] = item
+    select_ranks(buffer, offsets[:-1], offsets[1:], percentile_ranks(counts, percentiles))
+    return buffer, offsets
+
+
+def segment_percentiles(buffer: np.ndarray, start: np.ndarray, stop: np.ndarray, percentiles: tuple,
+                        method: str = 'linear') -> np.ndarray:
+    """
+
+    This function is used to read percentiles of many sorted series at once.
+
+    The i-th series is buffer[start[i]:stop[i]], which must be sorted. The result has one row per series and one
+    column per percentile, and follows `np.percentile` with the 'linear' or the 'midpoint' method.
+
+    """
+    position = (stop - start - 1)[:, None] * (np.asarray(percentiles, dtype=float) / 100)[None, :]
+    low = np.floor(position).astype(int)
+    high = np.ceil(position).astype(int)
+    lower = buffer[start[:, None] + low]
+    upper = buffer[start[:, None] + high]
+    if method == 'midpoint':
+        return (lower + upper) / 2
+    return lower + (position - low) * (upper - lower)
+
+
+def weighted_percentiles(buffer: np.ndarray, weights: np.ndarray, start: np.ndarray, stop: np.ndarray,
+                         percentiles: tuple, method: str = 'linear') -> np.ndarray:
+    """
+
+    This function is used to read percentiles of many sorted and weighted series at once.
+
+    The i-th series is buffer[start[i]:stop[i]], which must be sorted, each value being repeated as many times as
+    its weight in `weights`. The weights must be positive whole numbers, since the ranks count repeated values, and
+    the series must follow one another in the buffer. The result is the same as `segment_percentiles` on the
+    repeated values, without repeating them: the k-th repeated value is found by a binary search of k in the
+    cumulative weights.
+
+    """
+    cumulative = np.cumsum(weights)
+    base = np.concatenate(([0], cumulative))[start]
+    total = np.concatenate(([0], cumulative))[stop] - base
+    position = np.maximum(total - 1, 0)[:, None] * (np.asarray(percentiles, dtype=float) / 100)[None, :]
+    low = np.floor(position)
+    high = np.ceil(position)
+
+    def value_at(rank):
+        index = np.searchsorted(cumulative, base[:, None] + rank, side='right')
+        return buffer[np.clip(index, start[:, None], stop[:, None] - 1)]
+
+    lower = value_at(low)
+    upper = value_at(high)
+    if method == 'midpoint':
+        return (lower + upper) / 2
+    return lower + (position - low) * (upper - lower)
+
+
+def segment_histograms(buffer: np.ndarray, start: np.ndarray, stop: np.ndarray, bins: int,
+                       weights: np.ndarray = None) -> (np.ndarray, np.ndarray):
+    """
+
+    This function is used to count the histograms of many sorted series at once.
+
+    The i-th series is buffer[start[i]:stop[i]], which must be sorted, and the series must follow one another in the
+    buffer. The counts and the edges have shapes (n, bins) and (n, bins + 1), and are the same as those of
+    `np.histogram` called on every series: the intervals cover [min, max] of the series, the last one is closed, and
+    a constant series gets the intervals of [value - 0.5, value + 0.5]. If given, `weights` holds the weight of every
+    value of the buffer, which is counted instead of 1. Like in `sort_series`, the histograms of many short series are
+    counted together with a single `np.bincount`, while long series are counted one by one by `np.histogram`, which
+    is faster on them and does not allocate temporaries as large as the buffer.
+
+    """
+    n = len(start)
+    if (stop - start).sum() >= 256 * n:
+        counts = np.zeros((n, bins), dtype=int if weights is None else float)
+        edges = np.empty((n, bins + 1))
+        for i, (a, b) in enumerate(zip(start, stop)):
+            counts[i], edges[i] = np.histogram(buffer[a:b], bins, weights=None if weights is None else weights[a:b])
+        return counts, edges
+    first, last = buffer[start], buffer[stop - 1]
+    flat = first == last
+    first = np.where(flat, first - 0.5, first)
+    last = np.where(flat, last + 0.5, last)
+    edges = np.linspace(first, last, bins + 1, axis=1)
+    segment = np.repeat(np.arange(n), stop - start)
+    # the bin of every value, corrected by one where the rounding puts it on the wrong side of an edge
+    index = ((buffer - first[segment]) / (last - first)[segment] * bins).astype(np.intp)
+    index[index == bins] -= 1
+    flat_edges = edges.ravel()
+    row = segment * (bins + 1)
+    index[buffer < flat_edges[row + index]] -= 1
+    index[(buffer >= flat_edges[row + index + 1]) & (index != bins - 1)] += 1
+    counts = np.bincount(segment * bins + index, weights=weights, minlength=n * bins).reshape(n, bins)
+    return counts, edges
+
+
+@profiled
+def compute_box_stats(data: List[np.ndarray or List[int or float]] or np.ndarray, whis: float = 1.5,
+                      bins: int = None, percentiles: tuple = None,
+                      workers: int or concurrent.futures.Executor = None,
+                      weights: List[np.ndarray or List[int or float]] or np.ndarray = None,
+                      groups: int = None) -> BoxStats:
+    """
+    Compute the statistics of the boxes of multiple series.
+
+    Parameters
+    ----------
+    data: List[np.ndarray or List[int or float]] or np.ndarray
+        consists in a list of list and each item of data is a list containing multiple series of numerical values.
+
+    whis: float, default: 1.5
+        The position of the whiskers. Values below Q1 - whis*(Q3-Q1) or above Q3 + whis*(Q3-Q1) are outliers.
+
+    bins: int, optional
+        If given, the histogram of each series with this number of bins is computed too,
+        as needed by `histobox_plot` and `creative_boxplot`.
+
+    percentiles: tuple, optional
+        If given, these percentiles of the inliers of each series are computed too with the 'midpoint' method,
+        as needed by `info_boxplot_v3`.
+
+    workers: int or concurrent.futures.Executor, optional
+        If given, the series are split into groups computed by a pool of this many processes, or by this executor.
+        The values are handed to the processes through shared memory instead of being pickled. It pays off for
+        plots with many large series.
+
+    weights: List[np.ndarray or List[int or float]] or np.ndarray, optional
+        If given, the whole number of times every value of data was seen, with the same shape as data, such as when
+        the series arrive as (value, count) pairs or as histograms. Every value counts as if it was repeated that
+        many times, without being repeated: the quartiles, the percentiles, the histograms and the means are
+        weighted, `count` holds the total weight of each series, and every outlier is kept once. The weighted
+        statistics are computed in the calling process, whatever `workers`.
+
+    groups: int, optional, default: workers, or the number of CPUs for an executor
+        The number of groups the series are split into when `workers` is given, one task of the pool each.
+
+    When a cache is enabled by `statscache.enable_cache`, the statistics of the same data and parameters are computed
+    once and shared by the later calls, so they should not be modified.
+
+    Returns
+    -------
+    BoxStats
+
+    """
+    data = check_data(data)
+    if weights is not None:
+        weights = check_data(weights)
+        assert len(weights) == len(data) and all(len(w) == len(item) for w, item in zip(weights, data)), \
+            "The weights should have the same shape as the data"
+    cache = active_cache()
+    if cache is None:
+        return _compute_box_stats(data, whis, bins, percentiles, workers, weights, groups)
+    with stage('fingerprint'):
+        key = (fingerprint(data, cache.mode), whis, bins, None if percentiles is None else tuple(percentiles),
+               None if weights is None else fingerprint(weights, cache.mode))
+    sources = ()
+    if cache.mode == 'id':
+        sources = tuple(item for items in (data, weights) if items is not None
+                        for item in ([items] if isinstance(items, np.ndarray) else items))
+    stats = cache.get(key, sources)
+    if stats is None:
+        stats = cache.put(key, _compute_box_stats(data, whis, bins, percentiles, workers, weights, groups), sources)
+    annotate(series_sizes=stats.count)
+    return stats
+
+
+def _compute_box_stats(data: List[np.ndarray] or np.ndarray, whis: float, bins: int, percentiles: tuple,
+                       workers: int or concurrent.futures.Executor,
+                       weights: List[np.ndarray] or np.ndarray = None, groups: int = None) -> BoxStats:
+    """
+    Compute the statistics of checked data, see `compute_box_stats`.
+    """
+    if weights is not None:
+        return _compute_box_stats_weighted(data, weights, whis, bins, percentiles)
+    if workers is not None and workers != 1 and len(data) > 1:
+        with stage('parallel'):
+            return _compute_box_stats_parallel(data, whis, bins, percentiles, workers, groups)
+    if isinstance(data, np.ndarray):
+        return _compute_box_stats_dense(data, whis, bins, percentiles)
+    # long series are only partitioned around their quartiles, unless the percentiles of the inliers are needed
+    partitioned = percentiles is None and sum(len(item) for item in data) >= PARTITION_SIZE * len(data)
+    with stage('sort'):
+        buffer, offsets = partition_series(data) if partitioned else sort_series(data)
+    start, stop = offsets[:-1], offsets[1:]
+    count = stop - start
+    annotate(series_sizes=count)
+
+    # get the quantiles of every series at once
+    with stage('quantiles'):
+        q1, median, q3 = segment_percentiles(buffer, start, stop, (25, 50, 75)).T
+    iqr = q3 - q1
+    # the lower and the upper bound of the box
+    low_bound = q1 - whis * iqr
+    up_bound = q3 + whis * iqr
+
+    # pick out the outliers, which are at both ends of each sorted series
+    with stage('outliers'):
+        if partitioned:
+            n_below, n_above, whislo, whishi, fliers, mean = _partitioned_outliers(buffer, start, stop, low_bound,
+                                                                                   up_bound)
+        else:
+            below = buffer < np.repeat(low_bound, count)
+            above = buffer > np.repeat(up_bound, count)
+            n_below = np.add.reduceat(below, start)
+            n_above = np.add.reduceat(above, start)
+            outlier = below | above
+            fliers = buffer[outlier]
+            mean = np.add.reduceat(np.where(outlier, 0, buffer), start) / (count - n_below - n_above)
+            whislo, whishi = buffer[start + n_below], buffer[stop - n_above - 1]
+    # the inliers of the i-th series are buffer[inlier_start[i]:inlier_stop[i]]
+    inlier_start, inlier_stop = start + n_below, stop - n_above
+
+    extra = None
+    if percentiles is not None:
+        with stage('percentiles'):
+            extra = segment_percentiles(buffer, inlier_start, inlier_stop, percentiles, method='midpoint')
+    hist_counts = hist_edges = None
+    if bins is not None:
+        with stage('histograms'):
+            hist_counts, hist_edges = segment_histograms(buffer, start, stop, bins)
+
+    return BoxStats(whis=whis,
+                    count=count,
+                    mean=mean,
+                    q1=q1, median=median, q3=q3,
+                    low_bound=low_bound, up_bound=up_bound,
+                    whislo=whislo, whishi=whishi,
+                    data_min=buffer[start], data_max=buffer[stop - 1],
+                    fliers=fliers,
+                    flier_offsets=np.concatenate(([0], np.cumsum(n_below + n_above))),
+                    percentiles=extra,
+                    hist_counts=hist_counts,
+                    hist_edges=hist_edges)
+
+
+def _partitioned_outliers(buffer: np.ndarray, start: np.ndarray, stop: np.ndarray, low_bound: np.ndarray,
+                          up_bound: np.ndarray) -> tuple:
+    """
+    Pick out the outliers of series partitioned around their quartiles by `partition_series`.
+
+    The values below the lower bound all lie before the first quartile, and the values above the upper bound after
+    the third quartile, so only these two ends of each series are scanned. It returns the numbers of outliers below
+    and above, the ends of the whiskers, the sorted outliers and the means of the inliers.
+    """
+    ranks = percentile_ranks(stop - start, (25, 75))
+    n = len(start)
+    n_below, n_above = np.empty(n, dtype=int), np.empty(n, dtype=int)
+    whislo, whishi, mean = np.empty(n), np.empty(n), np.empty(n)
+    fliers = []
+    for i, (a, b) in enumerate(zip(start, stop)):
+        series = buffer[a:b]
+        # the ceiling of the first quartile is an inlier, and so is the floor of the third one
+        head, tail = series[:ranks[i, 2] + 1], series[ranks[i, 1]:]
+        low, high = head[head < low_bound[i]], tail[tail > up_bound[i]]
+        whislo[i] = head[head >= low_bound[i]].min()
+        whishi[i] = tail[tail <= up_bound[i]].max()
+        n_below[i], n_above[i] = len(low), len(high)
+        mean[i] = (series.sum() - low.sum() - high.sum()) / (len(series) - len(low) - len(high))
+        fliers += [np.sort(low), np.sort(high)]
+    return n_below, n_above, whislo, whishi, np.concatenate(fliers), mean
+
+
+def _compute_box_stats_dense(data: np.ndarray, whis: float, bins: int, percentiles: tuple) -> BoxStats:
+    """
+    Compute the statistics of the rows of a 2-D array, see `compute_box_stats`.
+
+    All the rows have the same length, so the quartiles are read from the same columns of every sorted row, and the
+    outliers, whiskers and means come from masks reduced along the rows, without any offsets. Long rows are only
+    partitioned around these columns, like in `partition_series`, unless the percentiles of the inliers are needed.
+    """
+    n, m = data.shape
+    assert m, "Every series should contain at least one value"
+    rows = np.arange(n)
+    partitioned = percentiles is None and m >= PARTITION_SIZE
+    position = (m - 1) * np.array([0.25, 0.5, 0.75])
+    low = np.floor(position).astype(int)
+    high = np.ceil(position).astype(int)
+    with stage('sort'):
+        values = np.array(data, dtype=float)
+        if partitioned:
+            select_ranks(values.ravel(), rows * m, (rows + 1) * m, np.tile(np.concatenate((low, high)), (n, 1)))
+        else:
+            values.sort(axis=1)
+    count = np.full(n, m)
+    annotate(series_sizes=count)
+
+    # get the quartiles of every row at once
+    with stage('quantiles'):
+        q1, median, q3 = (values[:, low] + (position - low) * (values[:, high] - values[:, low])).T
+    iqr = q3 - q1
+    # the lower and the upper bound of the box
+    low_bound = q1 - whis * iqr
+    up_bound = q3 + whis * iqr
+
+    # pick out the outliers, which are at both ends of each sorted row
+    buffer = values.ravel()
+    start = rows * m
+    with stage('outliers'):
+        if partitioned:
+            n_below, n_above, whislo, whishi, fliers, mean = _partitioned_outliers(buffer, start, start + m,
+                                                                                   low_bound, up_bound)
+        else:
+            below = values < low_bound[:, None]
+            above = values > up_bound[:, None]
+            n_below = below.sum(axis=1)
+            n_above = above.sum(axis=1)
+            outlier = below | above
+            fliers = values[outlier]
+            mean = np.where(outlier, 0, values).sum(axis=1) / (m - n_below - n_above)
+            whislo, whishi = values[rows, n_below], values[rows, m - 1 - n_above]
+
+    extra = None
+    if percentiles is not None:
+        with stage('percentiles'):
+            extra = segment_percentiles(buffer, start + n_below, start + m - n_above, percentiles, method='midpoint')
+    hist_counts = hist_edges = None
+    if bins is not None:
+        with stage('histograms'):
+            hist_counts, hist_edges = segment_histograms(buffer, start, start + m, bins)
+
+    return BoxStats(whis=whis,
+                    count=count,
+                    mean=mean,
+                    q1=q1, median=median, q3=q3,
+                    low_bound=low_bound, up_bound=up_bound,
+                    whislo=whislo, whishi=whishi,
+                    data_min=values[:, 0], data_max=values[:, -1],
+                    fliers=fliers,
+                    flier_offsets=np.concatenate(([0], np.cumsum(n_below + n_above))),
+                    percentiles=extra,
+                    hist_counts=hist_counts,
+                    hist_edges=hist_edges)
+
+
+def _compute_box_stats_weighted(data: List[np.ndarray] or np.ndarray, weights: List[np.ndarray] or np.ndarray,
+                                whis: float, bins: int, percentiles: tuple) -> BoxStats:
+    """
+    Compute the statistics of series whose values have weights, see `compute_box_stats`.
+
+    The values of weight 0 are dropped, and the others are sorted with their weights, so the time and the memory
+    follow the number of distinct values rather than the total weight.
+    """
+    with stage('sort'):
+        sizes = np.array([len(item) for item in data], dtype=int)
+        buffer = np.concatenate(list(data)).astype(float, copy=False)
+        weight = np.concatenate(list(weights))
+        assert (weight >= 0).all(), "The weights should not be negative"
+        assert (weight == np.floor(weight)).all(), "The weights should be whole numbers of occurrences"
+        segment = np.repeat(np.arange(len(data)), sizes)
+        keep = weight > 0
+        buffer, weight, segment = buffer[keep], weight[keep], segment[keep]
+        order = np.lexsort((buffer, segment))
+        buffer, weight, segment = buffer[order], weight[order], segment[order]
+        sizes = np.bincount(segment, minlength=len(data))
+        assert sizes.all(), "Every series should contain at least one value of positive weight"
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    start, stop = offsets[:-1], offsets[1:]
+    # the total weight keeps the type of the weights, so that counts stay integers
+    count = np.add.reduceat(weight, start)
+    weight = weight.astype(float, copy=False)
+    annotate(series_sizes=count)
+
+    # get the weighted quantiles of every series at once
+    with stage('quantiles'):
+        q1, median, q3 = weighted_percentiles(buffer, weight, start, stop, (25, 50, 75)).T
+    iqr = q3 - q1
+    # the lower and the upper bound of the box
+    low_bound = q1 - whis * iqr
+    up_bound = q3 + whis * iqr
+
+    # pick out the outliers, which are at both ends of each sorted series
+    with stage('outliers'):
+        below = buffer < np.repeat(low_bound, sizes)
+        above = buffer > np.repeat(up_bound, sizes)
+        n_below = np.add.reduceat(below, start)
+        n_above = np.add.reduceat(above, start)
+        outlier = below | above
+    # the inliers of the i-th series are buffer[inlier_start[i]:inlier_stop[i]]
+    inlier_start, inlier_stop = start + n_below, stop - n_above
+    inlier_weight = np.where(outlier, 0, weight)
+
+    extra = None
+    if percentiles is not None:
+        with stage('percentiles'):
+            extra = weighted_percentiles(buffer, weight, inlier_start, inlier_stop, percentiles, method='midpoint')
+    hist_counts = hist_edges = None
+    if bins is not None:
+        with stage('histograms'):
+            hist_counts, hist_edges = segment_histograms(buffer, start, stop, bins, weights=weight)
+
+    return BoxStats(whis=whis,
+                    count=count,
+                    mean=np.add.reduceat(inlier_weight * buffer, start) / np.add.reduceat(inlier_weight, start),
+                    q1=q1, median=median, q3=q3,
+                    low_bound=low_bound, up_bound=up_bound,
+                    whislo=buffer[inlier_start], whishi=buffer[inlier_stop - 1],
+                    data_min=buffer[start], data_max=buffer[stop - 1],
+                    fliers=buffer[outlier],
+                    flier_offsets=np.concatenate(([0], np.cumsum(n_below + n_above))),
+                    percentiles=extra,
+                    hist_counts=hist_counts,
+                    hist_edges=hist_edges)
+
+
+def concat_box_stats(parts: List[BoxStats]) -> BoxStats:
+    """
+    Put the statistics of several groups of series one after another, as if they were computed together.
+    """
+    assert len(set(part.whis for part in parts)) == 1, "Only statistics with the same whis can be put together"
+
+    def join(name):
+        values = [getattr(part, name) for part in parts]
+        return None if any(value is None for value in values) else np.concatenate(values)
+
+    flier_counts = np.concatenate([np.diff(part.flier_offsets) for part in parts])
+    return BoxStats(whis=parts[0].whis,
+                    flier_offsets=np.concatenate(([0], np.cumsum(flier_counts))),
+                    **{name: join(name) for name in BoxStats.__slots__ if name not in ('whis', 'flier_offsets')})
+
+
+def _compute_shared(name: str, offsets: np.ndarray, whis: float, bins: int, percentiles: tuple) -> BoxStats:
+    """
+    Compute, in a worker process, the statistics of the series lying at `offsets` of the shared memory block `name`.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    buffer = np.ndarray((offsets[-1] - offsets[0],), dtype=float, buffer=block.buf, offset=offsets[0] * 8)
+    try:
+        series = [buffer[a:b] for a, b in zip(offsets[:-1] - offsets[0], offsets[1:] - offsets[0])]
+        return compute_box_stats(series, whis=whis, bins=bins, percentiles=percentiles)
+    finally:
+        # the views must be released before the block is closed
+        series = buffer = None
+        block.close()
+
+
+def _compute_box_stats_parallel(data: List[np.ndarray] or np.ndarray, whis: float, bins: int, percentiles: tuple,
+                                workers: int or concurrent.futures.Executor, groups: int = None) -> BoxStats:
+    """
+    Compute the statistics of groups of series in parallel, the values being shared with the workers.
+
+    Without `groups`, there is one group for each process of the pool, or for each CPU when the pool is an executor,
+    whose number of processes is not public.
+    """
+    counts = np.array([len(item) for item in data], dtype=int)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    executor = workers
+    if not isinstance(workers, concurrent.futures.Executor):
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        groups = groups or workers
+    n_groups = min(len(data), groups or os.cpu_count() or 1)
+    # groups of consecutive series holding about the same number of values
+    bounds = np.searchsorted(offsets, np.linspace(0, offsets[-1], n_groups + 1)[1:-1])
+    bounds = np.unique(np.concatenate(([0], bounds, [len(data)])))
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, offsets[-1] * 8))
+    try:
+        buffer = np.ndarray((offsets[-1],), dtype=float, buffer=block.buf)
+        for item, a, b in zip(data, offsets[:-1], offsets[1:]):
+            buffer[a:b] = item
+        futures = [executor.submit(_compute_shared, block.name, offsets[first:last + 1], whis, bins, percentiles)
+                   for first, last in zip(bounds[:-1], bounds[1:])]
+        return concat_box_stats([future.result() for future in futures])
+    finally:
+        if executor is not workers:
+            executor.shutdown()
+        buffer = None
+        block.close()
+        block.unlink()
+
+
+class StreamingBoxStats:
+    """
+    The box statistics of multiple series read chunk by chunk, in a bounded memory.
+
+    Each series is summarized by a `sketches.QuantileSketch`, which gives approximate quantiles, and by a
+    `sketches.Extremes` reservoir, which keeps its lowest and highest values exactly. The count, the minimum and the
+    maximum are exact, and so are the outliers as long as there are at most `max_fliers` of them at each end.
+    Beyond that, only the `max_fliers` most extreme ones are kept and the whisker on that side ends at the bound.
+
+    The statistics of parts of the series, computed by several processes or machines, are combined by `merge`, and
+    `to_dict`/`from_dict` turn them into plain python values to send them around. When the histograms must be exact
+    after merging, give every part the same grid of bin edges.
+
+    Parameters
+    ----------
+    n_series: int
+        The number of series.
+
+    k: int, default: 200
+        The accuracy of the quantile sketches, the rank of the quartiles being off by a small multiple of count/k.
+
+    max_fliers: int, default: 1000
+        The number of outliers kept at each end of each series.
+
+    seed: int, optional
+        The seed of the quantile sketches.
+
+    edges: np.ndarray, optional
+        The increasing edges of a grid of bins shared by all series. If given, the values falling into each bin are
+        counted exactly, and `to_box_stats` uses these counts as the histograms. Values outside the grid are counted
+        apart in `outside`.
+
+    """
+
+    __slots__ = ('sketches', 'extremes', 'edges', 'grid_counts', 'outside')
+
+    def __init__(self, n_series: int, k: int = 200, max_fliers: int = 1000, seed: int = None,
+                 edges: np.ndarray = None):
+        self.sketches = [QuantileSketch(k, None if seed is None else seed + i) for i in range(n_series)]
+        self.extremes = [Extremes(max_fliers) for _ in range(n_series)]
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+        self.grid_counts = None if edges is None else np.zeros((n_series, len(self.edges) - 1), dtype=int)
+        # the number of values below and above the grid
+        self.outside = None if edges is None else np.zeros((n_series, 2), dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.sketches)
+
+    def __repr__(self) -> str:
+        return "StreamingBoxStats(series={}, count={})".format(len(self), sum(map(len, self.sketches)))
+
+    def update(self, index: int, chunk: np.ndarray or List[int or float]) -> 'StreamingBoxStats':
+        """
+        Add a chunk of values to the `index`-th series.
+        """
+        chunk = np.asarray(chunk)
+        if chunk.dtype.kind not in NUMERIC_KINDS:
+            raise InvalidInput("The element in chunk should be numerical values, not {}".format(chunk.dtype))
+        self.sketches[index].update(chunk)
+        self.extremes[index].update(chunk)
+        if self.edges is not None:
+            self.grid_counts[index] += np.histogram(chunk, bins=self.edges)[0]
+            self.outside[index] += (np.count_nonzero(chunk < self.edges[0]), np.count_nonzero(chunk > self.edges[-1]))
+        return self
+
+    def merge(self, other: 'StreamingBoxStats') -> 'StreamingBoxStats':
+        """
+        Add the values summarized by another `StreamingBoxStats` of the same series.
+        """
+        assert len(self) == len(other), "Only statistics of the same number of series can be merged"
+        assert (self.edges is None) == (other.edges is None) and \
+            (self.edges is None or np.array_equal(self.edges, other.edges)), \
+            "Only statistics with the same grid of bins can be merged"
+        for index in range(len(self)):
+            self.sketches[index].merge(other.sketches[index])
+            self.extremes[index].merge(other.extremes[index])
+        if self.edges is not None:
+            self.grid_counts += other.grid_counts
+            self.outside += other.outside
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Return the state of the statistics as plain python values, which can be written with `json` or `pickle`.
+        """
+        return {'sketches': [sketch.to_dict() for sketch in self.sketches],
+                'extremes': [extremes.to_dict() for extremes in self.extremes],
+                'edges': None if self.edges is None else self.edges.tolist(),
+                'grid_counts': None if self.edges is None else self.grid_counts.tolist(),
+                'outside': None if self.edges is None else self.outside.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'StreamingBoxStats':
+        """
+        Rebuild the statistics from the state returned by `to_dict`.
+        """
+        stream = cls(0)
+        stream.sketches = [QuantileSketch.from_dict(item) for item in state['sketches']]
+        stream.extremes = [Extremes.from_dict(item) for item in state['extremes']]
+        if state['edges'] is not None:
+            stream.edges = np.asarray(state['edges'], dtype=float)
+            stream.grid_counts = np.asarray(state['grid_counts'], dtype=int).reshape(len(stream.sketches), -1)
+            stream.outside = np.asarray(state['outside'], dtype=int).reshape(-1, 2)
+        return stream
+
+    def to_box_stats(self, whis: float = 1.5, bins: int = None, percentiles: tuple = None) -> BoxStats:
+        """
+        Build the `BoxStats` of the series read so far, with the same parameters as `compute_box_stats`.
+
+        If `bins` is given, the histograms are estimated from the sketches. Otherwise the exact counts of the shared
+        grid are used, if there is one.
+        """
+        rows, fliers, extra, hist_counts, hist_edges = [], [], [], [], []
+        for sketch, extremes in zip(self.sketches, self.extremes):
+            assert sketch.count, "Every series should contain at least one value"
+            # get the quantiles
+            q1, median, q3 = sketch.percentiles((25, 50, 75))
+            iqr = q3 - q1
+            # the lower and the upper bound of the box
+            low_bound = q1 - whis * iqr
+            up_bound = q3 + whis * iqr
+
+            # pick out the outliers among the extremes, the counts are exact while the reservoir holds inliers
+            low, high = extremes.low, extremes.high
+            low_fliers, high_fliers = low[low < low_bound], high[high > up_bound]
+            exact = len(low_fliers) < len(low) and len(high_fliers) < len(high)
+            # otherwise the outliers are so many that the whisker ends at the bound
+            if len(low_fliers) < len(low):
+                n_below, whislo = len(low_fliers), low[len(low_fliers)]
+            else:
+                n_below, whislo = sketch.rank(low_bound), low_bound
+            if len(high_fliers) < len(high):
+                n_above, whishi = len(high_fliers), high[len(high) - len(high_fliers) - 1]
+            else:
+                n_above, whishi = sketch.count - sketch.rank(np.nextafter(up_bound, np.inf)), up_bound
+
+            # the mean of the inliers
+            if exact:
+                mean = (sketch.sum - low_fliers.sum() - high_fliers.sum()) / (sketch.count - n_below - n_above)
+            else:
+                items, weights = sketch.weighted_items()
+                inside = (items >= low_bound) & (items <= up_bound)
+                mean = np.average(items[inside], weights=weights[inside])
+
+            rows.append((sketch.count, mean, q1, median, q3, low_bound, up_bound, whislo, whishi,
+                         sketch.min, sketch.max))
+            fliers.append(np.concatenate((low_fliers, high_fliers)))
+            if percentiles is not None:
+                position = n_below + (sketch.count - n_below - n_above - 1) * np.asarray(percentiles) / 100
+                extra.append((sketch.value_at(np.floor(position)) + sketch.value_at(np.ceil(position))) / 2)
+            if bins is not None:
+                items, weights = sketch.weighted_items()
+                counts, edges = np.histogram(items, bins=bins, range=(sketch.min, sketch.max), weights=weights)
+                hist_counts.append(counts)
+                hist_edges.append(edges)
+
+        count, mean, q1, median, q3, low_bound, up_bound, whislo, whishi, data_min, data_max = \
+            np.array(rows, dtype=float).reshape(-1, 11).T
+        if bins is None and self.edges is not None:
+            hist_counts = self.grid_counts.copy()
+            hist_edges = np.tile(self.edges, (len(self), 1))
+        elif bins is not None:
+            hist_counts = np.array(hist_counts)
+            hist_edges = np.array(hist_edges, dtype=float)
+        else:
+            hist_counts = hist_edges = None
+        return BoxStats(whis=whis,
+                        count=count.astype(int),
+                        mean=mean,
+                        q1=q1, median=median, q3=q3,
+                        low_bound=low_bound, up_bound=up_bound,
+                        whislo=whislo, whishi=whishi,
+                        data_min=data_min, data_max=data_max,
+                        fliers=np.concatenate(fliers) if fliers else np.empty(0),
+                        flier_offsets=np.concatenate(([0], np.cumsum([len(item) for item in fliers]))).astype(int),
+                        percentiles=np.array(extra, dtype=float) if percentiles is not None else None,
+                        hist_counts=hist_counts,
+                        hist_edges=hist_edges)
+
+
+def merge_streaming_stats(parts: List['StreamingBoxStats' or dict]) -> 'StreamingBoxStats':
+    """
+    Combine the statistics of parts of the same series, such as the results of a `multiprocessing` pool.
+
+    Each part is a `StreamingBoxStats` or the state returned by its `to_dict`. None of the parts is modified.
+    """
+    assert len(parts), "There should be at least one part to merge"
+    parts = [StreamingBoxStats.from_dict(part.to_dict() if isinstance(part, StreamingBoxStats) else part)
+             for part in parts]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return merged
+
+
+def compute_box_stats_streaming(data: List[Iterable or np.ndarray], whis: float = 1.5, bins: int = None,
+                                percentiles: tuple = None, k: int = 200, max_fliers: int = 1000,
+                                chunksize: int = 2 ** 20) -> BoxStats:
+    """
+    Compute the statistics of the boxes of multiple series without holding any series in memory.
+
+    The quartiles are estimated by quantile sketches, see `StreamingBoxStats` for the accuracy of the result.
+
+    Parameters
+    ----------
+    data: List[Iterable or np.ndarray]
+        Each item of data is an iterable of chunks of numerical values, such as a generator reading a file,
+        or an array (for example a `np.memmap`) which is read `chunksize` values at a time.
+
+    whis, bins, percentiles:
+        The same as for `compute_box_stats`.
+
+    k: int, default: 200
+        The accuracy of the quantile sketches.
+
+    max_fliers: int, default: 1000
+        The number of outliers kept at each end of each series.
+
+    chunksize: int, default: 2 ** 20
+        The number of values read at a time from an array.
+
+    Returns
+    -------
+    BoxStats
+
+    """
+    stream = StreamingBoxStats(len(data), k=k, max_fliers=max_fliers)
+    for index, series in enumerate(data):
+        if isinstance(series, np.ndarray):
+            series = [series[i:i + chunksize] for i in range(0, len(series), chunksize)]
+        for chunk in series:
+            stream.update(index, chunk)
+    return stream.to_box_stats(whis=whis, bins=bins, percentiles=percentiles)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides a box plot which is updated in place as new values of its series arrive, for dashboards
+
+The statistics are kept by a `boxstats.StreamingBoxStats`, so a refresh costs the same whatever the number of values
+read so far. The artists are created once by one of the plot functions of `boxplots`, and a refresh only gives them
+the geometry built by `boxplots.plot_geometry`, which can be blitted on an interactive canvas.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+from typing import Callable, List
+import numpy as np
+import matplotlib.axes
+import matplotlib.collections
+import matplotlib.patches
+from matplotlib.path import Path
+from boxplots import MULTIPLEBOX_PERCENTILES, creative_boxplot, info_boxplot_v3, plot_geometry
+from boxstats import BoxStats, StreamingBoxStats
+
+
+def _set_data(artist, data) -> bool:
+    """
+    Give `artist` the geometry `data` built for it by `boxplots.plot_geometry`, and tell if it was possible.
+
+    The lines of a collection are styled one by one, so their number has to stay the same.
+    """
+    if isinstance(artist, matplotlib.collections.LineCollection):
+        segments = np.concatenate(data)
+        if len(segments) != len(artist.get_paths()):
+            return False
+        artist.set_segments(segments)
+    elif isinstance(artist, matplotlib.collections.CircleCollection):
+        artist.set_offsets(data)
+    elif isinstance(artist, matplotlib.collections.PolyCollection):
+        artist.set_verts(data)
+    elif isinstance(artist, matplotlib.patches.PathPatch):
+        artist.set_path(Path(data))
+    else:
+        return False
+    return True
+
+
+class LiveBoxplot:
+    """
+    A box plot of series whose values keep arriving, drawn by one of the plot functions of `boxplots`.
+
+    New values are given to `append`, and `refresh` draws the statistics of all the values read so far. The first
+    refresh calls the plot function on `ax`. The next ones only build the geometry of its artists with
+    `boxplots.plot_geometry`, and give it to the artists of `ax` with `set_segments`, `set_offsets`, `set_verts` and
+    `set_path`, so `ax` is never cleared and nothing else is drawn. When the layout changes, for instance when a line
+    appears, the artists of `ax` are built again.
+
+    With `blit`, the artists are animated: the background of the figure is saved once, and a refresh restores it,
+    draws the artists of the box plot and blits the axes, as long as the limits of the axes stay the same.
+
+    Parameters
+    ----------
+    ax: matplotlib.axes
+
+    n_series: int
+        The number of series.
+
+    plot: function, default: creative_boxplot
+        One of the five plot functions of `boxplots`.
+
+    whis: float, default: 1.5
+        The position of the whiskers.
+
+    bins: int, default: 10
+        The number of bins of the histograms of `histobox_plot` and `creative_boxplot`.
+
+    blit: bool, default: False
+        If True, the refreshes are blitted.
+
+    k, max_fliers, seed:
+        The parameters of the `boxstats.StreamingBoxStats` keeping the statistics.
+
+    **kwargs:
+        The other parameters of the plot function, such as colors.
+
+    """
+
+    def __init__(self, ax: matplotlib.axes, n_series: int, plot: Callable = creative_boxplot, whis: float = 1.5,
+                 bins: int = 10, blit: bool = False, k: int = 200, max_fliers: int = 1000, seed: int = None,
+                 **kwargs):
+        self.ax = ax
+        self.plot = plot
+        self.whis = whis
+        self.bins = bins
+        self.blit = blit
+        self.kwargs = kwargs
+        self.stream = StreamingBoxStats(n_series, k=k, max_fliers=max_fliers, seed=seed)
+        self.artists = []
+        self._background = None
+        self._limits = None
+        self._draw_event = None
+
+    def __repr__(self) -> str:
+        return "LiveBoxplot(plot={}, series={}, artists={})".format(self.plot.__name__, len(self.stream),
+                                                                    len(self.artists))
+
+    def append(self, index: int, values: np.ndarray or List[int or float]) -> 'LiveBoxplot':
+        """
+        Add new values to the `index`-th series. Nothing is drawn before `refresh`.
+        """
+        self.stream.update(index, values)
+        return self
+
+    def extend(self, values: List[np.ndarray or List[int or float]]) -> 'LiveBoxplot':
+        """
+        Add new values to every series, the i-th item of `values` going to the i-th series.
+        """
+        assert len(values) == len(self.stream), "There should be one item of values for each series"
+        for index, item in enumerate(values):
+            if len(item):
+                self.stream.update(index, item)
+        return self
+
+    def box_stats(self) -> BoxStats:
+        """
+        Return the statistics of the values read so far, as needed by the plot function.
+        """
+        percentiles = MULTIPLEBOX_PERCENTILES if self.plot is info_boxplot_v3 else None
+        return self.stream.to_box_stats(whis=self.whis, bins=self.bins, percentiles=percentiles)
+
+    def _draw(self, stats: BoxStats) -> list:
+        # the new artists are kept in the order they were added, which is the order of `plot_geometry`
+        before = set(map(id, self.ax.get_children()))
+        kwargs = dict(self.kwargs)
+        if self.plot is creative_boxplot:
+            kwargs.setdefault('whis', self.whis)
+        self.plot(self.ax, stats, **kwargs)
+        return [artist for artist in self.ax.get_children() if id(artist) not in before
+                and isinstance(artist, (matplotlib.collections.Collection, matplotlib.patches.Patch))]
+
+    def _build(self, stats: BoxStats):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = self._draw(stats)
+        for artist in self.artists:
+            artist.set_animated(self.blit)
+        self._limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        self._background = None
+
+    def _draw_artists(self):
+        # by zorder like a full draw, the outliers being below the lines
+        for artist in sorted(self.artists, key=lambda artist: artist.get_zorder()):
+            self.ax.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # save the figure without the animated artists, then draw them over it
+        canvas = self.ax.figure.canvas
+        self._background = canvas.copy_from_bbox(self.ax.figure.bbox)
+        self._draw_artists()
+
+    def refresh(self) -> 'LiveBoxplot':
+        """
+        Draw the statistics of the values read so far.
+        """
+        stats = self.box_stats()
+        canvas = self.ax.figure.canvas
+        if not self.artists:
+            self._build(stats)
+        else:
+            geometry = plot_geometry(self.plot, self.ax, stats, **self.kwargs)
+            if len(geometry) != len(self.artists) or not all(map(_set_data, self.artists, geometry)):
+                self._build(stats)
+        if not self.blit:
+            canvas.draw_idle()
+            return self
+        if self._draw_event is None:
+            self._draw_event = canvas.mpl_connect('draw_event', self._on_draw)
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        if self._background is None or limits != self._limits:
+            # the background holds the axes, so it is saved again when they change
+            self._limits = limits
+            canvas.draw()
+        else:
+            canvas.restore_region(self._background)
+            self._draw_artists()
+            canvas.blit(self.ax.figure.bbox)
+        canvas.flush_events()
+        return self
+
+    def close(self):
+        """
+        Stop listening to the draws of the canvas.
+        """
+        if self._draw_event is not None:
+            self.ax.figure.canvas.mpl_disconnect(self._draw_event)
+            self._draw_event = None
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    rng = np.random.default_rng(0)
+    fig, ax = plt.subplots()
+    live = LiveBoxplot(ax, 3, blit=True)
+    plt.show(block=False)
+    for second in range(30):
+        live.extend([rng.normal(50, 10, 100), rng.normal(40, 20, 100), rng.standard_cauchy(100) + 60])
+        live.refresh()
+        plt.pause(0.1)
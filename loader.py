@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides a loader of csv files, such as `Android_open_source_dataset.csv`, for the module `boxplots`
+
+The csv file is parsed once into typed columns of NumPy, which are written next to it as one `.npy` file per column.
+Later loads memory-map these files, so that only the values which are used are read from the disk. The cache is
+rebuilt when the csv file changes.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import csv
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+import numpy as np
+
+# the version of the layout of the cache, a cache with another version is rebuilt
+CACHE_VERSION = 1
+
+_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_TIMEDELTA = re.compile(r'^(-?\d+) days? (\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,9}))?$')
+
+
+def file_hash(path: str) -> str:
+    """
+
+    This function is used to compute the sha256 digest of a file, reading it by blocks of 1 MiB.
+
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_timedelta(text: str) -> int:
+    days, hours, minutes, seconds, fraction = _TIMEDELTA.match(text).groups()
+    nanoseconds = int((fraction or '0').ljust(9, '0'))
+    return ((int(days) * 24 + int(hours)) * 60 + int(minutes)) * 60 * 10 ** 9 + int(seconds) * 10 ** 9 + nanoseconds
+
+
+def parse_column(values: List[str]) -> np.ndarray:
+    """
+
+    This function is used to convert the texts of a column into the narrowest type which holds all of them.
+
+    The types are tried in this order: integers, floats, booleans, dates ('2017-08-28'), durations
+    ('293 days 12:00:00.000000000') and texts. Empty fields are missing values, they become nan in floats and NaT in
+    dates and durations. Integers and booleans with missing values are stored as floats.
+
+    """
+    values = np.array(values, dtype=str)
+    missing = values == ''
+    present = values[~missing]
+    if not missing.any():
+        try:
+            return values.astype(np.int64)
+        except ValueError:
+            pass
+    if np.isin(present, ('True', 'False')).all() and len(present):
+        if not missing.any():
+            return values == 'True'
+        return np.where(missing, np.nan, values == 'True')
+    try:
+        return np.where(missing, 'nan', values).astype(float)
+    except ValueError:
+        pass
+    if all(_DATE.match(item) for item in present) and len(present):
+        return np.where(missing, 'NaT', values).astype('datetime64[D]')
+    if all(_TIMEDELTA.match(item) for item in present) and len(present):
+        column = np.full(len(values), np.timedelta64('NaT'), dtype='timedelta64[ns]')
+        column[~missing] = [_parse_timedelta(item) for item in present]
+        return column
+    return values
+
+
+def read_csv(path: str, encoding: str = 'ISO-8859-1', index_col: bool = True) -> Dict[str, np.ndarray]:
+    """
+
+    This function is used to parse a csv file with a header into typed columns, see `parse_column`.
+
+    Parameters
+    ----------
+    path: str
+        The path of the csv file.
+
+    encoding: str, default: 'ISO-8859-1'
+        The encoding of the csv file.
+
+    index_col: bool, default: True
+        If True, the first column is the index written by pandas and it is left out.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The columns by name, in the order of the header.
+
+    """
+    with open(path, newline='', encoding=encoding) as file:
+        rows = list(csv.reader(file))
+    assert rows, "The csv file should have a header"
+    header, rows = rows[0], rows[1:]
+    assert all(len(row) == len(header) for row in rows), "Every row should have as many fields as the header"
+    start = 1 if index_col else 0
+    return {name: parse_column([row[index] for row in rows]) for index, name in enumerate(header) if index >= start}
+
+
+def _cache_dir(path: str) -> str:
+    return path + '.cache'
+
+
+def _read_meta(cache_dir: str) -> dict or None:
+    try:
+        with open(os.path.join(cache_dir, 'meta.json')) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def _write_cache(cache_dir: str, table: Dict[str, np.ndarray], meta: dict):
+    os.makedirs(cache_dir, exist_ok=True)
+    # the names of columns such as 'ci/cd' can not be file names
+    meta['columns'] = []
+    for index, (name, column) in enumerate(table.items()):
+        filename = 'column_{}.npy'.format(index)
+        np.save(os.path.join(cache_dir, filename), column)
+        meta['columns'].append([name, filename])
+    # the meta file is written last, so a cache which is half written is never read
+    _write_meta(cache_dir, meta)
+
+
+def _write_meta(cache_dir: str, meta: dict):
+    # the meta file is replaced at once, so it is never read half written
+    temporary = os.path.join(cache_dir, 'meta.json.tmp')
+    with open(temporary, 'w') as file:
+        json.dump(meta, file)
+    os.replace(temporary, os.path.join(cache_dir, 'meta.json'))
+
+
+def load_table(path: str, encoding: str = 'ISO-8859-1', index_col: bool = True, cache_dir: str = None,
+               mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+
+    This function is used to load the columns of a csv file through a binary cache.
+
+    The first load parses the csv file with `read_csv` and writes every column to a `.npy` file in `cache_dir`. The
+    next loads read these files back, memory-mapped when `mmap` is True. The cache is still valid when the size and
+    the modification time of the csv file are unchanged. Otherwise the sha256 digest of the csv file is compared
+    with the one of the cache, so a file which is only touched is not parsed again.
+
+    Parameters
+    ----------
+    path: str
+        The path of the csv file.
+
+    encoding: str, default: 'ISO-8859-1'
+        The encoding of the csv file.
+
+    index_col: bool, default: True
+        If True, the first column is the index written by pandas and it is left out.
+
+    cache_dir: str, optional, default: path + '.cache'
+        The directory of the cache.
+
+    mmap: bool, default: True
+        If True, the columns are read-only memory-mapped arrays, otherwise they are loaded into memory.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The columns by name, in the order of the header.
+
+    """
+    cache_dir = cache_dir or _cache_dir(path)
+    status = os.stat(path)
+    meta = _read_meta(cache_dir)
+    valid = (meta is not None and meta['encoding'] == encoding and meta['index_col'] == index_col
+             and meta['size'] == status.st_size)
+    if valid and meta['mtime_ns'] != status.st_mtime_ns:
+        digest = file_hash(path)
+        valid = meta['sha256'] == digest
+        if valid:
+            meta['mtime_ns'] = status.st_mtime_ns
+            _write_meta(cache_dir, meta)
+    if not valid:
+        meta = {'version': CACHE_VERSION, 'encoding': encoding, 'index_col': index_col, 'size': status.st_size,
+                'mtime_ns': status.st_mtime_ns, 'sha256': file_hash(path)}
+        _write_cache(cache_dir, read_csv(path, encoding=encoding, index_col=index_col), meta)
+    # the columns are read back from the cache even after writing it, so they are of the same type at every load
+    mmap_mode = 'r' if mmap else None
+    return {name: np.load(os.path.join(cache_dir, filename), mmap_mode=mmap_mode)
+            for name, filename in meta['columns']}
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    table = load_table("Android_open_source_dataset.csv")
+    print("{} columns of {} rows loaded in {:.1f} ms".format(len(table), len(table['stars']),
+                                                             (time.perf_counter() - start) * 1000))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides an opt-in profiler of the functions of the modules `boxplots` and `boxstats`
+
+While a `Profiler` is active, every call of a plot function (or of `compute_box_stats` called alone) is recorded:
+the wall time of the whole call and of each of its stages, the sizes of the series, the number of artists added to
+the axes and the peak of memory allocated during the call, measured by `tracemalloc`.
+
+    with Profiler() as profiler:
+        creative_boxplot(ax, data)
+        profiler.time_draw(fig)
+    print(profiler.to_json())
+
+When no profiler is active, the instrumented functions only check an empty list.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, List
+
+# the active profilers, the records of the calls being run and the names of the stages being run
+_profilers = []
+_calls = []
+_stages = []
+
+
+def _count_artists(ax) -> dict:
+    return {'collections': len(ax.collections), 'patches': len(ax.patches), 'lines': len(ax.lines),
+            'texts': len(ax.texts)}
+
+
+class Profiler:
+    """
+    Record the calls of the instrumented functions made while it is active, as a context manager.
+
+    Parameters
+    ----------
+    memory: bool, default: True
+        If True, the peak of memory allocated by each call is measured with `tracemalloc`, which is started for the
+        time the profiler is active. It slows the calls down.
+
+    callback: function, optional
+        A function called with the record of every call as soon as the call ends.
+
+    """
+
+    def __init__(self, memory: bool = True, callback: Callable[[dict], None] = None):
+        self.memory = memory
+        self.callback = callback
+        self.records = []
+        self._tracing = False
+
+    def __repr__(self) -> str:
+        return "Profiler(calls={})".format(len(self.records))
+
+    def __enter__(self) -> 'Profiler':
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _profilers.remove(self)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def add(self, record: dict):
+        """
+        Keep the record of a call and hand it to the callback.
+        """
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def time_draw(self, figure) -> float:
+        """
+        Draw a figure with its canvas and record the time it took as a call of 'draw'.
+        """
+        start = time.perf_counter()
+        figure.canvas.draw()
+        wall = time.perf_counter() - start
+        self.add({'function': 'draw', 'wall': wall, 'stages': {}, 'series_sizes': None, 'artists': None,
+                  'peak_memory': None})
+        return wall
+
+    def report(self) -> dict:
+        """
+        Return the records of the calls and, for each function, the number of calls and the total time of the calls
+        and of each stage.
+        """
+        summary = {}
+        for record in self.records:
+            item = summary.setdefault(record['function'], {'calls': 0, 'wall': 0.0, 'stages': {}})
+            item['calls'] += 1
+            item['wall'] += record['wall']
+            for name, seconds in record['stages'].items():
+                item['stages'][name] = item['stages'].get(name, 0.0) + seconds
+        return {'calls': self.records, 'summary': summary}
+
+    def to_json(self, path: str = None, indent: int = 2) -> str:
+        """
+        Return the report as JSON, and write it to `path` if given.
+        """
+        text = json.dumps(self.report(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+
+def profiled(function: Callable) -> Callable:
+    """
+    Record the calls of `function` in the active profilers. A call made by another recorded call is part of it.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _profilers or _calls:
+            return function(*args, **kwargs)
+        record = {'function': function.__name__, 'wall': None, 'stages': {}, 'series_sizes': None, 'artists': None,
+                  'peak_memory': None}
+        ax = args[0] if args and hasattr(args[0], 'collections') else None
+        before = _count_artists(ax) if ax is not None else None
+        memory = tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        _calls.append(record)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record['wall'] = time.perf_counter() - start
+            _calls.pop()
+            del _stages[:]
+            if memory:
+                record['peak_memory'] = tracemalloc.get_traced_memory()[1] - base
+            if ax is not None:
+                after = _count_artists(ax)
+                record['artists'] = {kind: after[kind] - before[kind] for kind in after}
+            for profiler in list(_profilers):
+                profiler.add(record)
+
+    return wrapper
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Add the time spent in the block to the stage `name` of the call being recorded. Stages can be nested, the time
+    of a stage inside the stage 'stats' being recorded as 'stats/name'.
+    """
+    if not _calls:
+        yield
+        return
+    _stages.append(name)
+    path = '/'.join(_stages)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = _calls[-1]['stages']
+        stages[path] = stages.get(path, 0.0) + time.perf_counter() - start
+        _stages.pop()
+
+
+def annotate(series_sizes: List[int] = None, **values):
+    """
+    Add values, such as the sizes of the series, to the record of the call being recorded.
+    """
+    if not _calls:
+        return
+    if series_sizes is not None:
+        values['series_sizes'] = [int(size) for size in series_sizes]
+    _calls[-1].update(values)
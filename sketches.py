@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides summaries of streams of values which serve the module `boxstats`
+
+They need a bounded memory whatever the length of the stream is, and two summaries of the same kind can be merged,
+so that a series bigger than the memory can be read chunk by chunk or by several workers.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    A mergeable sketch of the quantiles of a stream of values, in the style of the KLL sketch.
+
+    The values are kept in levels, and a value in the level h stands for 2**h values of the stream. When a level grows
+    over its capacity, it is sorted and every other value moves to the next level. At most about 3*k values are kept,
+    and the rank of the quantiles is off by a small multiple of count/k. The count, the sum, the minimum and the
+    maximum are exact.
+
+    Parameters
+    ----------
+    k: int, default: 200
+        The capacity of the highest level, which sets the accuracy of the sketch.
+
+    seed: int, optional
+        The seed of the random choices made when a level is compacted.
+
+    """
+
+    __slots__ = ('k', 'count', 'sum', 'min', 'max', 'levels', '_rng')
+
+    def __init__(self, k: int = 200, seed: int = None):
+        assert k >= 2, "The capacity k should be at least 2"
+        self.k = k
+        self.count = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return "QuantileSketch(k={}, count={}, kept={})".format(self.k, self.count, sum(map(len, self.levels)))
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd value stays in this level, the others are halved into the next one
+                rest, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = rest
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+                # the capacities of the lower levels shrink when a level is added
+                level = 0 if level + 2 == len(self.levels) else level + 1
+            else:
+                level += 1
+
+    def update(self, values: np.ndarray) -> 'QuantileSketch':
+        """
+        Add a chunk of values to the sketch.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values):
+            self.count += len(values)
+            self.sum += values.sum()
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self.levels[0] = np.concatenate((self.levels[0], values))
+            self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Add the values summarized by another sketch to this one.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def weighted_items(self) -> (np.ndarray, np.ndarray):
+        """
+        Return the kept values in increasing order and the number of values of the stream each one stands for.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0 ** level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def rank(self, value: float) -> float:
+        """
+        Return the approximate number of values of the stream smaller than `value`.
+        """
+        items, weights = self.weighted_items()
+        return weights[:np.searchsorted(items, value, side='left')].sum()
+
+    def value_at(self, ranks: np.ndarray) -> np.ndarray:
+        """
+        Return the approximate values of the given 0-based ranks in the sorted stream.
+        """
+        ranks = np.asarray(ranks, dtype=float)
+        items, weights = self.weighted_items()
+        index = np.searchsorted(np.cumsum(weights), ranks + 1, side='left')
+        values = items[np.clip(index, 0, len(items) - 1)]
+        # the extremes are known exactly
+        values = np.where(ranks <= 0, self.min, values)
+        return np.where(ranks >= self.count - 1, self.max, values)
+
+    def to_dict(self) -> dict:
+        """
+        Return the state of the sketch as plain python values, which can be written with `json` or `pickle`.
+        """
+        return {'k': self.k, 'count': self.count, 'sum': float(self.sum), 'min': float(self.min),
+                'max': float(self.max), 'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: dict, seed: int = None) -> 'QuantileSketch':
+        """
+        Rebuild a sketch from the state returned by `to_dict`.
+        """
+        sketch = cls(state['k'], seed)
+        sketch.count = state['count']
+        sketch.sum = state['sum']
+        sketch.min = state['min']
+        sketch.max = state['max']
+        sketch.levels = [np.asarray(items, dtype=float) for items in state['levels']]
+        return sketch
+
+    def percentiles(self, percentiles: tuple, method: str = 'linear') -> np.ndarray:
+        """
+        Return approximate percentiles of the stream, following `np.percentile` with the 'linear' or the 'midpoint'
+        method.
+        """
+        assert self.count, "The sketch should contain at least one value"
+        position = (self.count - 1) * np.asarray(percentiles, dtype=float) / 100
+        lower, upper = self.value_at(np.floor(position)), self.value_at(np.ceil(position))
+        if method == 'midpoint':
+            return (lower + upper) / 2
+        return lower + (position - np.floor(position)) * (upper - lower)
+
+
+class Extremes:
+    """
+    The `size` lowest and the `size` highest values of a stream, kept exactly.
+
+    They serve as a bounded reservoir of outliers, since the outliers of a series are its most extreme values.
+
+    Parameters
+    ----------
+    size: int, default: 1000
+        The number of values kept at each end.
+
+    """
+
+    __slots__ = ('size', 'low', 'high')
+
+    def __init__(self, size: int = 1000):
+        self.size = size
+        self.low = np.empty(0)
+        self.high = np.empty(0)
+
+    def __repr__(self) -> str:
+        return "Extremes(size={}, low={}, high={})".format(self.size, len(self.low), len(self.high))
+
+    def update(self, values: np.ndarray) -> 'Extremes':
+        """
+        Add a chunk of values.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        low = np.concatenate((self.low, values))
+        if len(low) > self.size:
+            low = np.partition(low, self.size - 1)[:self.size]
+        high = np.concatenate((self.high, values))
+        if len(high) > self.size:
+            high = np.partition(high, len(high) - self.size)[len(high) - self.size:]
+        self.low, self.high = np.sort(low), np.sort(high)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Return the state of the reservoir as plain python values, which can be written with `json` or `pickle`.
+        """
+        return {'size': self.size, 'low': self.low.tolist(), 'high': self.high.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'Extremes':
+        """
+        Rebuild a reservoir from the state returned by `to_dict`.
+        """
+        extremes = cls(state['size'])
+        extremes.low = np.asarray(state['low'], dtype=float)
+        extremes.high = np.asarray(state['high'], dtype=float)
+        return extremes
+
+    def merge(self, other: 'Extremes') -> 'Extremes':
+        """
+        Add the values kept by another reservoir of the same size.
+        """
+        assert self.size == other.size, "Only reservoirs of the same size can be merged"
+        self.low = np.sort(np.concatenate((self.low, other.low)))[:self.size]
+        self.high = np.sort(np.concatenate((self.high, other.high)))[-self.size:]
+        return self
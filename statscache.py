@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module provides a cache of the statistics computed by the modules `boxstats` and `boxplots`
+
+Once `enable_cache` is called, `compute_box_stats` looks its result up by a fingerprint of the data and by the
+statistical parameters (whis, bins, percentiles), and the curves of `creative_boxplot` are looked up by their
+statistics. Drawing the same series again with other colors, labels or rotation then skips all the numerical work.
+The least recently used entries are dropped when the cache holds more than `maxbytes` of arrays.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import List
+import numpy as np
+
+# the cache used by `compute_box_stats` and `creative_boxplot`, None when caching is disabled
+_cache = None
+
+
+def fingerprint(data: List[np.ndarray] or np.ndarray, mode: str = 'hash') -> str or tuple:
+    """
+
+    This function is used to identify the values of data, which is a 2-D array or a list of arrays.
+
+    With the 'hash' mode, the shapes, the dtypes and the bytes of the arrays are hashed with blake2b, which is much
+    cheaper than sorting them and notices any change of the values. With the 'id' mode, only the identities,
+    addresses, shapes and dtypes of the arrays are used, which costs nothing but does not notice when the values of an
+    array are changed in place, and never matches lists, which are turned into new arrays at every call. Since an id
+    is reused once its array is freed, such a fingerprint should be looked up with the arrays themselves as the
+    sources of `BoxStatsCache.get` and `BoxStatsCache.put`.
+
+    """
+    assert mode in ('hash', 'id'), "The mode should be 'hash' or 'id', not {}".format(mode)
+    items = [data] if isinstance(data, np.ndarray) else data
+    if mode == 'id':
+        return tuple((id(item), item.ctypes.data, item.shape, item.strides, item.dtype.str) for item in items)
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update("{}{}".format(item.shape, item.dtype.str).encode())
+        digest.update(np.ascontiguousarray(item).data)
+    return digest.hexdigest()
+
+
+def _nbytes(value) -> int:
+    values = value if isinstance(value, tuple) else (value,)
+    total = 0
+    for item in values:
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+        elif hasattr(item, '__slots__'):
+            total += sum(getattr(item, name).nbytes for name in item.__slots__
+                         if isinstance(getattr(item, name), np.ndarray))
+    return total
+
+
+class BoxStatsCache:
+    """
+    A least recently used cache of statistics, bounded by the size of the arrays it holds.
+
+    Parameters
+    ----------
+    maxbytes: int, default: 256 MiB
+        The largest size of the arrays held by the cache.
+
+    mode: str, default: 'hash'
+        The way the data is identified, see `fingerprint`.
+
+    """
+
+    __slots__ = ('maxbytes', 'mode', 'nbytes', 'hits', 'misses', '_entries')
+
+    def __init__(self, maxbytes: int = 256 * 2 ** 20, mode: str = 'hash'):
+        assert mode in ('hash', 'id'), "The mode should be 'hash' or 'id', not {}".format(mode)
+        self.maxbytes = maxbytes
+        self.mode = mode
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return "BoxStatsCache(entries={}, nbytes={}, hits={}, misses={})".format(len(self), self.nbytes, self.hits,
+                                                                                 self.misses)
+
+    def get(self, key, sources: tuple = ()):
+        """
+        Return the value of `key`, or None if it is not in the cache or was not put with the same `sources`.
+        """
+        entry = self._entries.get(key)
+        if entry is None or len(entry[2]) != len(sources) or \
+                any(ref() is not item for ref, item in zip(entry[2], sources)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, sources: tuple = ()):
+        """
+        Keep the value of `key`, and drop the least recently used entries until the cache fits `maxbytes`.
+
+        The arrays of the value are made read-only, since they are shared by every later lookup. The entry holds weak
+        references to the arrays of `sources`, the data the value was computed from: it is dropped as soon as one of
+        them is freed, and `get` only returns it for the same arrays, so a key made of ids never matches other data
+        which took their place.
+        """
+        values = value if isinstance(value, tuple) else (value,)
+        for item in values:
+            arrays = [item] if isinstance(item, np.ndarray) else \
+                [getattr(item, name) for name in getattr(item, '__slots__', ())]
+            for array in arrays:
+                if isinstance(array, np.ndarray):
+                    array.flags.writeable = False
+        size = _nbytes(value)
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        refs = tuple(weakref.ref(item, lambda ref, key=key: self._expire(key, ref)) for item in sources)
+        self._entries[key] = (value, size, refs)
+        self.nbytes += size
+        while self.nbytes > self.maxbytes and self._entries:
+            self.nbytes -= self._entries.popitem(last=False)[1][1]
+        return value
+
+    def _expire(self, key, ref):
+        """
+        Drop the entry of `key` if it was computed from the array `ref` referred to, which has been freed.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and any(item is ref for item in entry[2]):
+            self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        self._entries.clear()
+        self.nbytes = 0
+
+
+def enable_cache(maxbytes: int = 256 * 2 ** 20, mode: str = 'hash') -> BoxStatsCache:
+    """
+
+    This function is used to start caching the statistics, and return the cache.
+
+    """
+    global _cache
+    _cache = BoxStatsCache(maxbytes, mode)
+    return _cache
+
+
+def disable_cache():
+    """
+
+    This function is used to stop caching the statistics and drop the cache.
+
+    """
+    global _cache
+    _cache = None
+
+
+def active_cache() -> BoxStatsCache or None:
+    """
+
+    This function is used to get the cache in use, or None when caching is disabled.
+
+    """
+    return _cache
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module checks that `batch.render_batch` finishes when its workers are replaced, run by pytest
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import os
+import numpy as np
+from batch import RenderJob, render_batch
+
+
+def test_render_batch_recycles_workers(tmp_path):
+    # 12 jobs for 2 workers replaced after 2 figures each, so every worker is replaced several times
+    rng = np.random.default_rng(0)
+    jobs = [RenderJob(str(tmp_path / 'figure{}'.format(index)), [rng.normal(size=50) for _ in range(3)],
+                      plot='info_boxplot_v1', figsize=(2, 2), dpi=20) for index in range(12)]
+    paths = render_batch(jobs, workers=2, tasks_per_worker=2)
+    assert paths == ['{}.png'.format(job.path) for job in jobs]
+    assert all(os.path.getsize(path) for path in paths)
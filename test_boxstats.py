@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module checks the fast paths of `boxstats` against the plain computations they replace, run by pytest
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import numpy as np
+import pytest
+import boxstats
+from boxstats import BoxStats, compute_box_stats
+
+
+def test_weighted_percentiles_match_repeated_values():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        sizes = rng.integers(1, 20, rng.integers(1, 5))
+        values = [np.sort(rng.normal(size=size)) for size in sizes]
+        weights = [rng.integers(1, 5, size) for size in sizes]
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        percentiles = (0, 5, 25, 50, 75, 95, 100)
+        for method in ('linear', 'midpoint'):
+            result = boxstats.weighted_percentiles(np.concatenate(values), np.concatenate(weights).astype(float),
+                                                   offsets[:-1], offsets[1:], percentiles, method=method)
+            expected = [np.percentile(np.repeat(item, weight), percentiles, method=method)
+                        for item, weight in zip(values, weights)]
+            np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_weighted_stats_match_repeated_values():
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        data = [rng.integers(0, 20, rng.integers(1, 30)).astype(float) for _ in range(rng.integers(1, 6))]
+        weights = [rng.integers(0, 4, len(item)) for item in data]
+        for weight in weights:
+            weight[0] = max(weight[0], 1)
+        kwargs = dict(bins=7, percentiles=(5, 30, 50, 70, 95))
+        weighted = compute_box_stats(data, weights=weights, **kwargs)
+        repeated = compute_box_stats([np.repeat(item, weight) for item, weight in zip(data, weights)], **kwargs)
+        for name in ('count', 'mean', 'q1', 'median', 'q3', 'whislo', 'whishi', 'data_min', 'data_max',
+                     'percentiles', 'hist_counts', 'hist_edges'):
+            np.testing.assert_allclose(getattr(weighted, name), getattr(repeated, name), rtol=1e-10, err_msg=name)
+        # every outlier is kept once
+        for index in range(len(data)):
+            np.testing.assert_array_equal(weighted.fliers_of(index), np.unique(repeated.fliers_of(index)))
+
+
+def test_fractional_weights_are_rejected():
+    with pytest.raises(AssertionError):
+        compute_box_stats([[1.0, 2.0, 3.0]], weights=[[0.5, 0.5, 0.5]])
+
+
+def test_select_ranks_matches_sort():
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        sizes = rng.integers(1, 500, rng.integers(1, 5))
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        buffer = rng.integers(0, 50, offsets[-1]).astype(float) if rng.random() < 0.5 else rng.normal(size=offsets[-1])
+        expected = np.concatenate([np.sort(buffer[a:b]) for a, b in zip(offsets[:-1], offsets[1:])])
+        ranks = boxstats.percentile_ranks(sizes, (25, 50, 75))
+        boxstats.select_ranks(buffer, offsets[:-1], offsets[1:], ranks)
+        for a, b, kth in zip(offsets[:-1], offsets[1:], ranks):
+            segment = buffer[a:b]
+            assert segment[0] == expected[a] and segment[-1] == expected[b - 1]
+            for rank in np.unique(kth):
+                assert segment[rank] == expected[a + rank]
+                assert (segment[:rank] <= segment[rank]).all() and (segment[rank:] >= segment[rank]).all()
+
+
+def test_partitioned_stats_match_sorted_stats(monkeypatch):
+    rng = np.random.default_rng(3)
+    cases = []
+    for _ in range(60):
+        n = rng.integers(1, 5)
+        if rng.random() < 0.3:
+            data = rng.standard_cauchy((n, rng.integers(1, 2000)))
+        else:
+            data = [rng.standard_cauchy(rng.integers(1, 3000)) if rng.random() < 0.7
+                    else rng.integers(0, 10, rng.integers(1, 3000)) for _ in range(n)]
+        cases.append((data, dict(bins=7) if rng.random() < 0.7 else dict(percentiles=(30, 50, 70))))
+    # every series is partitioned, then every series is sorted
+    monkeypatch.setattr(boxstats, 'PARTITION_SIZE', 1)
+    partitioned = [compute_box_stats(data, **kwargs) for data, kwargs in cases]
+    monkeypatch.setattr(boxstats, 'PARTITION_SIZE', 10 ** 12)
+    for stats, (data, kwargs) in zip(partitioned, cases):
+        expected = compute_box_stats(data, **kwargs)
+        for name in BoxStats.__slots__:
+            value = getattr(stats, name)
+            if isinstance(value, np.ndarray):
+                np.testing.assert_allclose(value, getattr(expected, name), rtol=1e-10, err_msg=name)
+        np.testing.assert_allclose(stats.median, [np.median(item) for item in data], rtol=1e-12)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+
+This module checks that `import boxplots` stays cheap, run by pytest
+
+The import is measured by `benchmark.measure_import` in new interpreters, so the modules already loaded by pytest do
+not hide a slow or eager import.
+
+"""
+
+__author__ = "Group No.18 in DSP of Lanzhou University: Yuming Chen, Huiyi Liu"
+__copyright__ = "Copyright 2020, Study Project in Lanzhou University , China"
+__license__ = "GPL V3"
+__maintainer__ = "Yuming Chen"
+__email__ = ["chenym18@lzu.edu.cn", "liuhuiyi18@lzu.edu.cn"]
+__status__ = "Experimental"
+
+import benchmark
+
+# the largest time in seconds of `import boxplots`, the same as in the example of `benchmark`
+IMPORT_BUDGET = 0.5
+
+
+def test_import_budget():
+    # the fastest of several imports, so a busy machine does not fail the test
+    measured = benchmark.measure_import(repeat=7)
+    assert measured['seconds'] <= IMPORT_BUDGET, \
+        "Importing boxplots took {:.3f}s, over the budget of {}s".format(measured['seconds'], IMPORT_BUDGET)
+
+
+def test_import_is_lazy():
+    # `sys.modules` of a new interpreter after `import boxplots`, which pytest has not filled
+    measured = benchmark.measure_import(repeat=1)
+    assert not measured['loaded'], "Importing boxplots should not load {}".format(measured['loaded'])
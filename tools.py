@@ -21,24 +21,71 @@ class InvalidInput(TypeError):
     pass
 
 
+# the kinds of dtypes accepted as numerical values: booleans, signed and unsigned integers and floats
+NUMERIC_KINDS = 'biuf'
+
+
 def input_checking(data: List[np.ndarray or List[int or float]]) -> List[np.ndarray]:
     """
 
     This function is used to check if the input is valid and standardize the input when the input is a list.
 
+    Every item is turned into an array with `np.asarray`, so an array, a `np.memmap`, an `array.array` or any object
+    supporting the buffer protocol is used as it is, without a copy. Only lists are copied into new arrays. The data
+    of the caller is never modified.
+
     """
     try:
         def test(item):
             assert len(item.shape) == 1, "The item in list should be 1-D array, not {}".format(item)
-            assert item.dtype != '<U11', "The element in item should be numerical values"
+            assert item.dtype.kind in NUMERIC_KINDS, \
+                "The element in item should be numerical values, not {}".format(item.dtype)
             return item
 
-        return [test(np.array(item)) for item in data]
+        return [test(np.asarray(item)) for item in data]
     except TypeError:
         print("The input list has invalid item")
         raise InvalidInput
 
 
+def missing_values(column: np.ndarray) -> np.ndarray:
+    """
+
+    This function is used to find the missing values of a column, which are nan in floats and NaT in dates.
+
+    """
+    column = np.asarray(column)
+    if column.dtype.kind == 'f':
+        return np.isnan(column)
+    if column.dtype.kind in 'mM':
+        return np.isnat(column)
+    return np.zeros(len(column), dtype=bool)
+
+
+def group_by(values: np.ndarray, keys: np.ndarray) -> (np.ndarray, List[np.ndarray]):
+    """
+
+    This function is used to split a column of values into one series per distinct key.
+
+    The rows are ordered by key with a single stable `np.argsort`, and the values are gathered once in that order.
+    Every series is then a slice of the gathered values, which is a view and not a copy. Rows whose value or key is
+    missing are left out. It returns the sorted distinct keys and the series in the same order.
+
+    """
+    values, keys = np.asarray(values), np.asarray(keys)
+    assert values.shape == keys.shape and len(values.shape) == 1, "The values and the keys should be 1-D of same length"
+    present = ~(missing_values(values) | missing_values(keys))
+    if not present.all():
+        values, keys = values[present], keys[present]
+    assert len(values), "There should be at least one row whose value and key are not missing"
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    # the first row of every group
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    stops = np.append(starts[1:], len(keys))
+    return keys[starts], [values[a:b] for a, b in zip(starts, stops)]
+
+
 def gen_test_data(seed=None):
     """
 
@@ -60,3 +107,27 @@ def gen_test_data(seed=None):
     return [data, d2, d2[::2]]
 
 
+def gen_scaled_data(size: int = 1000, outlier_rate: float = 0.05, categories: int = 3,
+                    seed=None) -> List[np.ndarray]:
+    """
+
+    This function is used to generate test data of any size, like `gen_test_data`.
+
+    Each of the `categories` series has `size` values: a uniform spread over (0, 100) around a block of equal values,
+    and a share `outlier_rate` of values spread over (250, 350) and (-250, -150), which are always outliers since the
+    interquartile range is at most 100. The blocks of equal values of the series differ.
+
+    """
+    rng = np.random.default_rng(seed)
+    n_fliers = int(round(size * outlier_rate))
+    n_center = (size - n_fliers) // 3
+    n_spread = size - n_fliers - n_center
+    data = []
+    for index in range(categories):
+        spread = rng.random(n_spread) * 100
+        center = np.full(n_center, 50 - 10 * (index % 3))
+        flier_high = rng.random(n_fliers - n_fliers // 2) * 100 + 250
+        flier_low = rng.random(n_fliers // 2) * -100 - 150
+        data.append(np.concatenate((spread, center, flier_high, flier_low)))
+    return data
+